@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared functions to load and resample the channel cross-section surveys used
+to produce Figures 10, 11, and 12 in the following paper:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy.ndimage import gaussian_filter1d, median_filter
+from scipy.signal import savgol_filter
+
+#file prefix of the cross-section surveys in each lithology, in the order
+#the lithologies appear in the figures
+LITHOLOGIES = {'carb': 'DFC', 'coarse': 'DFSSC', 'fine': 'DFSSF'}
+
+def _section_numbers(path, prefix):
+    #survey numbers n of the files path/prefix_n.csv, in increasing order
+    numbers = []
+    for fname in glob.glob(os.path.join(path, prefix + '_*.csv')):
+        match = re.fullmatch(re.escape(prefix) + r'_(\d+)\.csv', os.path.basename(fname))
+        if match is not None:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+def load_cross_sections(path = '../data/cross_section_form/',
+                        lithologies = LITHOLOGIES, n_sections = None):
+    """Read every cross-section survey into a DataFrame sorted by Position.
+
+    Returns a dict mapping lithology name to a list of DataFrames, one per
+    cross-section, in survey order (e.g. DFC_1 ... DFC_10). All files named
+    prefix_n.csv are read unless n_sections is given, in which case surveys 
+    1 to n_sections are read. Blank XS_IDs are filled in as 
+    Location_XS_Number.
+    """
+    sections = {}
+    for lith, prefix in lithologies.items():
+        sections[lith] = []
+        if n_sections is None:
+            numbers = _section_numbers(path, prefix)
+        else:
+            numbers = range(1, n_sections + 1)
+        for n in numbers:
+            df = pd.read_csv(os.path.join(path, prefix + '_' + str(n) + '.csv'))
+            if df['Position'].is_monotonic_increasing == False:
+                df.sort_values('Position', inplace = True)
+                df.reset_index(drop = True, inplace = True)
+            #some surveys leave XS_ID blank; rebuild it as Location_XS_Number
+            if df['XS_ID'].isna().all():
+                df['XS_ID'] = df['Location'] + '_' + df['XS_Number'].astype(str)
+            sections[lith].append(df)
+    return sections
+
+def flatten_sections(sections):
+    """Return all cross-sections as one list (carb, then coarse, then fine)."""
+    list_of_dfs = []
+    for lith in sections:
+        list_of_dfs += sections[lith]
+    return list_of_dfs
+
+#storage precision of densified cross-sections: (position dtype, elevation
+#dtype). 'float32' halves memory relative to 'float64'; elevations then match
+#the float64 path to within ~1e-6 m and positions to within ~5e-6 m. 'mm'
+#stores positions as integer millimetres (exact to the nearest 0.5 mm) with
+#float32 elevations.
+PRECISIONS = {'float64': (np.float64, np.float64),
+              'float32': (np.float32, np.float32),
+              'mm': (np.int32, np.float32)}
+
+#define function to linearly interpolate cross-sections to dx resolution
+def densify_xs(df, dx, precision = 'float64'):
+    if precision not in PRECISIONS:
+        raise ValueError('precision must be one of ' + str(list(PRECISIONS)))
+    df = df.sort_values(by = 'Position').reset_index(drop=True)
+    x = df['Position']
+    z = df['Normalized_Z']
+    xnew = np.arange(df.loc[0, 'Position'], df.loc[df.index[-1], 'Position'] + dx, dx)
+    znew = np.interp(xnew, x, z)
+    if precision == 'float64':
+        return xnew, znew
+    pos_dtype, z_dtype = PRECISIONS[precision]
+    if precision == 'mm':
+        xnew = np.rint(xnew * 1000)
+    return xnew.astype(pos_dtype), znew.astype(z_dtype)
+
+def positions_mm(xnew, precision = 'float64'):
+    """Return densified positions from densify_xs as integer millimetres."""
+    if precision == 'mm':
+        return xnew
+    return np.rint(xnew * 1000).astype(np.int64)
+
+#smoothing filters that can be applied to densified cross-sections ahead of 
+#inflection counting
+SMOOTHING_METHODS = ['none', 'savgol', 'median', 'gaussian']
+
+def stack_profiles(profiles):
+    """Stack densified elevations into one array for batched filtering.
+
+    profiles is a list of (xnew, znew) pairs from densify_xs. Shorter 
+    profiles are padded by repeating their last elevation. Returns the 
+    n_profiles x max_length array and the length of each profile.
+    """
+    lengths = np.array([len(znew) for xnew, znew in profiles])
+    zstack = np.empty((len(profiles), lengths.max()), dtype = profiles[0][1].dtype)
+    for i, (xnew, znew) in enumerate(profiles):
+        zstack[i, :lengths[i]] = znew
+        zstack[i, lengths[i]:] = znew[-1]
+    return zstack, lengths
+
+def smooth_stack(zstack, method, width, dx):
+    """Smooth every row of a stack_profiles array in one batched filter.
+
+    method is one of SMOOTHING_METHODS. For every method, width [m] is the 
+    full window length, rounded to an odd number of samples: the window of 
+    the quadratic Savitzky-Golay fit ('savgol') and moving median 
+    ('median'), and the span of the Gaussian kernel ('gaussian'), truncated 
+    at three standard deviations (width / 6) on either side. Profiles are 
+    extended at their ends with their end elevations. Densified profiles 
+    are piecewise linear, and the quadratic Savitzky-Golay fit overshoots 
+    at their kinks (survey points), adding wiggles that raise inflection 
+    counts as the window widens, so it is left out of the default filter 
+    bank. Moving medians leave flat plateaus, so count inflections of 
+    smoothed profiles with reversals_only (see 
+    plot_fig12_roughness.count_inflections).
+    """
+    if method == 'none':
+        return zstack
+    window = int(round(width / dx)) // 2 * 2 + 1
+    if method == 'savgol':
+        smoothed = savgol_filter(zstack, max(window, 3), 2, axis = 1, 
+                                 mode = 'nearest')
+    elif method == 'median':
+        smoothed = median_filter(zstack, size = (1, window), mode = 'nearest')
+    elif method == 'gaussian':
+        smoothed = gaussian_filter1d(zstack, window / 6, axis = 1, 
+                                     mode = 'nearest', radius = window // 2)
+    else:
+        raise ValueError('method must be one of ' + str(SMOOTHING_METHODS))
+    return smoothed.astype(zstack.dtype, copy = False)
+
+def smooth_profiles(profiles, method, width, dx):
+    """Smooth a list of (xnew, znew) pairs from densify_xs; see smooth_stack."""
+    zstack, lengths = stack_profiles(profiles)
+    zstack = smooth_stack(zstack, method, width, dx)
+    return [(xnew, zstack[i, :lengths[i]]) for i, (xnew, znew) in enumerate(profiles)]
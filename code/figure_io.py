@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared function to write the figures for the following paper to disk:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import io
+import os
+import struct
+import zlib
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.collections import Collection
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.transforms import Affine2D, Bbox
+
+def save_figure(fig, name, out_dir = '../figures/', formats = ('png', 'pdf'),
+                dpi = 1000, tiled = False):
+    """Save fig as out_dir/name.<format> for each format; return the paths.
+
+    If tiled is True, PNGs are written with save_png_tiled.
+    """
+    paths = []
+    for fmt in formats:
+        fname = os.path.join(out_dir, name + '.' + fmt)
+        if tiled and fmt == 'png':
+            save_png_tiled(fig, fname, dpi = dpi)
+        else:
+            fig.savefig(fname, dpi = dpi, bbox_inches = 'tight')
+        paths.append(fname)
+    return paths
+
+def _tile_invariant(fig):
+    #True unless fig holds an artist that Agg may draw differently when it is
+    #cut by a tile boundary: dashed lines and edges, whose dashes restart at
+    #the boundary, and curves that are simplified or interpolated at draw
+    #time (long paths and non-affine transforms such as polar axes)
+    for artist in fig.findobj():
+        if not artist.get_visible():
+            continue
+        if isinstance(artist, Line2D):
+            if artist.is_dashed() or artist.get_path().should_simplify:
+                return False
+        elif isinstance(artist, Collection):
+            if any(dashes is not None for offset, dashes in artist.get_linestyle()):
+                return False
+            if any(path.should_simplify for path in artist.get_paths()):
+                return False
+        elif isinstance(artist, Patch):
+            if artist.get_linestyle() not in ('solid', '-', 'None', 'none', ' ', ''):
+                return False
+        else:
+            continue
+        if not artist.get_transform().is_affine:
+            return False
+    return True
+
+def _tile_layout(fig, dpi, pad_inches):
+    #bounding box [in] that savefig(bbox_inches = 'tight') would use at dpi,
+    #and the height [pixels] of the tallest single-path collection (e.g. a
+    #violin). Agg draws such a collection as a marker, snapped to whole 
+    #pixels, only if it is smaller than the canvas, so every strip must be
+    #taller than it to draw it as the full image does. Text is measured with
+    #a 1 x 1 pixel renderer, so no full-size canvas is allocated
+    orig_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        if fig.get_layout_engine() is not None:
+            fig.get_layout_engine().execute(fig)
+        bbox = fig.get_tightbbox(RendererAgg(1, 1, dpi)).padded(pad_inches)
+        tallest = 0.
+        for artist in fig.findobj(Collection):
+            paths = artist.get_paths()
+            if len(paths) != 1 or len(artist.get_transforms()) > 1:
+                continue
+            transform = artist.get_transform()
+            if len(artist.get_transforms()) == 1:
+                transform = Affine2D(artist.get_transforms()[0]) + transform
+            tallest = max(tallest, paths[0].get_extents(transform).height)
+        return bbox, tallest
+    finally:
+        fig.dpi = orig_dpi
+
+def _png_chunk(tag, data):
+    chunk = tag + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk))
+
+def save_png_tiled(fig, fname, dpi = 1000, tile_rows = 512, margin = 0.5, 
+                   pad_inches = 0.1):
+    """Save fig as a PNG like save_figure, rendering it in horizontal tiles.
+
+    Each tile of tile_rows pixel rows is rendered by savefig as a raw RGBA 
+    strip, cropped to the tight bounding box of the whole figure and 
+    aligned to its pixel rows, with margin [in] of extra rows above and 
+    below so that lines are clipped away from the rows kept (more if a 
+    single-path collection, such as a violin, is taller). Its rows are 
+    compressed into the PNG stream before the next tile is drawn, so peak 
+    memory scales with the tile size rather than the full image. 
+
+    Lines and patches match save_figure pixel for pixel for any tile_rows
+    (checked for Figures 7, 10, 11, and 12 at 72-1000 dpi with tile_rows 
+    of 1-1000). Text can differ by a few levels of antialiasing: glyphs 
+    are placed to 1/64 pixel, and where a label's position rounds on a 
+    tie, the strip offset can tip it (e.g. the x label of Figure 10 at 
+    450 dpi with tile_rows = 129; Figures 7, 10, 11, and 12 match exactly 
+    at the default tile_rows from 150 to 1000 dpi). margin must be at 
+    least 0.5 in; narrower margins clip lines close enough to the rows 
+    kept to change their antialiasing. A layout engine, if any, is run 
+    once and then removed while the strips are drawn, since savefig would
+    otherwise draw the whole figure for every strip. Dashed lines, whose 
+    dashes restart at strip edges, and curves that are simplified at draw 
+    time differ across tiles, so figures holding them (e.g. the dotted 
+    error bars of Figure 8 and the polar axes of Figure 9) are written in
+    one piece with savefig.
+    """
+    if tile_rows < 1:
+        raise ValueError('tile_rows must be positive')
+    if margin < 0.5:
+        #narrower margins clip line caps and joins close enough to the kept
+        #rows to change their antialiasing
+        raise ValueError('margin must be at least 0.5 in')
+    if not _tile_invariant(fig):
+        fig.savefig(fname, dpi = dpi, bbox_inches = 'tight', pad_inches = pad_inches)
+        return fname
+
+    bbox, tallest = _tile_layout(fig, dpi, pad_inches)
+    #image size in pixels, truncated as savefig does
+    width = int(bbox.width * dpi + 1e-8)
+    height = int(bbox.height * dpi + 1e-8)
+    margin_rows = max(int(np.ceil(margin * dpi)), int(np.ceil(tallest)) + 1)
+    #with a layout engine set (even the placeholder left by tight_layout), 
+    #savefig draws the whole figure before cropping it to each strip; the 
+    #layout was run above, so the engine is removed while the strips are drawn
+    engine = fig.get_layout_engine()
+    if engine is not None:
+        with matplotlib.rc_context({'figure.autolayout': False,
+                                    'figure.constrained_layout.use': False}):
+            fig.set_layout_engine(None)
+    try:
+        compressor = zlib.compressobj(6)
+        with open(fname, 'wb') as fh:
+            fh.write(b'\x89PNG\r\n\x1a\n')
+            fh.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+            pixels_per_metre = int(round(dpi / 0.0254))
+            fh.write(_png_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1)))
+            for top in range(0, height, tile_rows):
+                rows = min(tile_rows, height - top)
+                above = min(margin_rows, top)
+                below = min(margin_rows, height - top - rows)
+                #savefig anchors the image at the bottom of its bounding box
+                #and drops the fraction of a pixel above the last whole row,
+                #so the strip is given an extra half row at the top
+                n_rows = above + rows + below
+                bottom = bbox.y0 + (height - top - rows - below) / dpi
+                strip = Bbox.from_extents(bbox.x0, bottom, bbox.x1, bottom + (n_rows + 0.5) / dpi)
+                buf = io.BytesIO()
+                fig.savefig(buf, format = 'rgba', dpi = dpi, bbox_inches = strip)
+                pixels = np.frombuffer(buf.getbuffer(), dtype = np.uint8)
+                pixels = pixels.reshape(n_rows, width, 4)[above:above + rows]
+                #each PNG row starts with filter type 0 (none)
+                scanlines = np.zeros((rows, width * 4 + 1), dtype = np.uint8)
+                scanlines[:, 1:] = pixels.reshape(rows, width * 4)
+                data = compressor.compress(scanlines.tobytes())
+                if len(data) > 0:
+                    fh.write(_png_chunk(b'IDAT', data))
+            fh.write(_png_chunk(b'IDAT', compressor.flush()))
+            fh.write(_png_chunk(b'IEND', b''))
+    finally:
+        if engine is not None:
+            fig.set_layout_engine(engine)
+    return fname
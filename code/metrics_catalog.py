@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catalog of the per-section metrics behind Figures 11 and 12 in the following
+paper, stored in a local SQLite database:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Every row is keyed by XS_ID and parameter set (dx, sampling intervals,
+precision, smoothing filter, and bank overrides, stored as a JSON string)
+and carries the lithology, which is indexed. Sections are ordered by
+lithology and XS_Number. Tables:
+
+    parameter_sets: one row per parameter set
+    sections: section length, maximum and bank elevations [m]
+    inflections: inflection count and frequency at each sampling interval
+    elevations: densified elevations trimmed below the banks (Figure 11),
+        stored as float64 blobs
+
+read_roughness returns the inflection rows of one parameter set in the form
+analyze_roughness does, so Figure 12 can be drawn from the catalog.
+
+Writes are bulk upserts, so rerunning with new or resurveyed sections
+replaces their rows and leaves the others in place; write with prune = True
+to also delete the rows of sections that were not written.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from cross_sections import load_cross_sections, densify_xs, LITHOLOGIES
+from plot_fig11_hypsometry import trim_banks, BANK_OVERRIDES
+from plot_fig12_roughness import analyze_roughness, SPACINGS
+
+CATALOG = '../data/metrics_catalog.sqlite'
+
+#stored in the database's user_version; catalogs written with another schema
+#must be deleted and rewritten
+SCHEMA_VERSION = 2
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS parameter_sets (
+    params TEXT PRIMARY KEY,
+    dx REAL, spacings TEXT, precision TEXT, smoothing_method TEXT, 
+    smoothing_width REAL);
+CREATE TABLE IF NOT EXISTS sections (
+    xs_id TEXT, params TEXT, lithology TEXT, location TEXT, xs_number INTEGER,
+    xs_length REAL, max_z REAL, bank_z REAL, n_points INTEGER,
+    PRIMARY KEY (xs_id, params));
+CREATE TABLE IF NOT EXISTS inflections (
+    xs_id TEXT, params TEXT, spacing REAL, lithology TEXT,
+    count INTEGER, frequency REAL,
+    PRIMARY KEY (xs_id, params, spacing));
+CREATE TABLE IF NOT EXISTS elevations (
+    xs_id TEXT, params TEXT, lithology TEXT, n_elevations INTEGER, z BLOB,
+    PRIMARY KEY (xs_id, params));
+CREATE INDEX IF NOT EXISTS sections_lithology ON sections (lithology, params);
+CREATE INDEX IF NOT EXISTS inflections_lithology ON inflections (lithology, params, spacing);
+CREATE INDEX IF NOT EXISTS elevations_lithology ON elevations (lithology, params);
+'''
+
+def open_catalog(path = CATALOG):
+    """Open (creating if needed) the metrics catalog; return the connection."""
+    conn = sqlite3.connect(path)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    n_tables = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+    if version != SCHEMA_VERSION and (version != 0 or n_tables > 0):
+        conn.close()
+        raise ValueError(path + ' was written with catalog schema version ' 
+                         + str(version) + ', not ' + str(SCHEMA_VERSION) 
+                         + '; delete it and write the metrics again')
+    conn.executescript(SCHEMA)
+    conn.execute('PRAGMA user_version = ' + str(SCHEMA_VERSION))
+    return conn
+
+def parameter_key(dx = 0.1, spacings = SPACINGS, precision = 'float64', 
+                  smoothing = ('none', 0.), bank_overrides = BANK_OVERRIDES):
+    """Return the JSON string that identifies a parameter set."""
+    overrides = sorted([xs_id, left] for xs_id, left in bank_overrides.items())
+    return json.dumps({'dx': float(dx), 'precision': precision,
+                       'spacings': [float(spacing) for spacing in spacings],
+                       'smoothing': [smoothing[0], float(smoothing[1])],
+                       'bank_overrides': overrides}, sort_keys = True)
+
+def _upsert(conn, table, keys, columns, rows):
+    #insert rows, replacing the non-key columns of rows already present
+    names = keys + columns
+    sql = ('INSERT INTO ' + table + ' (' + ', '.join(names) + ') VALUES ('
+           + ', '.join(['?'] * len(names)) + ') ON CONFLICT (' + ', '.join(keys)
+           + ') DO UPDATE SET ' + ', '.join(col + ' = excluded.' + col for col in columns))
+    conn.executemany(sql, rows)
+
+def write_metrics(conn, sections, dx = 0.1, spacings = SPACINGS,
+                  precision = 'float64', smoothing = ('none', 0.),
+                  bank_overrides = BANK_OVERRIDES, prune = False):
+    """Compute every section's metrics and upsert them into the catalog.
+
+    sections is the output of cross_sections.load_cross_sections; the other
+    arguments are as for analyze_roughness and analyze_hypsometry. Rows of 
+    sections not in sections are kept unless prune is True, in which case 
+    they are deleted for this parameter set (for a full rewrite after 
+    sections were removed). All rows are written in one transaction. 
+    Returns the parameter key.
+    """
+    params = parameter_key(dx, spacings, precision, smoothing, bank_overrides)
+    roughness = analyze_roughness(sections, spacings, dx, precision, smoothing)
+
+    section_rows, inflection_rows, elevation_rows = [], [], []
+    k = 0
+    for lith in sections:
+        for df in sections[lith]:
+            xs_id = df['XS_ID'].iloc[0]
+            xnew, znew = densify_xs(df, dx, precision = precision)
+            left = bank_overrides.get(xs_id, 0)
+            trimmed = np.asarray(trim_banks(znew, left), dtype = '<f8')
+            section_rows.append((xs_id, params, lith, df['Location'].iloc[0], 
+                                 int(df['XS_Number'].iloc[0]),
+                                 float(roughness['xs_lengths'][k]),
+                                 float(df['Normalized_Z'].max()),
+                                 float(min(znew[left], znew[-1])), len(df)))
+            for j, spacing in enumerate(spacings):
+                inflection_rows.append((xs_id, params, float(spacing), lith,
+                                        int(roughness['inflection_data'][j, k]),
+                                        float(roughness['inflection_frequency'][j, k])))
+            elevation_rows.append((xs_id, params, lith, len(trimmed), trimmed.tobytes()))
+            k += 1
+
+    with conn:
+        _upsert(conn, 'parameter_sets', ['params'],
+                ['dx', 'spacings', 'precision', 'smoothing_method', 'smoothing_width'],
+                [(params, float(dx), json.dumps([float(spacing) for spacing in spacings]), 
+                  precision, smoothing[0], float(smoothing[1]))])
+        _upsert(conn, 'sections', ['xs_id', 'params'],
+                ['lithology', 'location', 'xs_number', 'xs_length', 'max_z',
+                 'bank_z', 'n_points'], section_rows)
+        _upsert(conn, 'inflections', ['xs_id', 'params', 'spacing'],
+                ['lithology', 'count', 'frequency'], inflection_rows)
+        _upsert(conn, 'elevations', ['xs_id', 'params'],
+                ['lithology', 'n_elevations', 'z'], elevation_rows)
+        if prune:
+            written = [row[0] for row in section_rows]
+            for table in ['sections', 'inflections', 'elevations']:
+                conn.execute('DELETE FROM ' + table + ' WHERE params = ? AND xs_id NOT IN ('
+                             + ', '.join(['?'] * len(written)) + ')', [params] + written)
+    return params
+
+def _where(**filters):
+    #WHERE clause and arguments for the filters that are not None
+    filters = {col: value for col, value in filters.items() if value is not None}
+    if len(filters) == 0:
+        return '', []
+    return (' WHERE ' + ' AND '.join(col + ' = ?' for col in filters),
+            list(filters.values()))
+
+def read_sections(conn, lithology = None, params = None):
+    """Return section rows (optionally one lithology and/or parameter set)."""
+    where, args = _where(lithology = lithology, params = params)
+    return pd.read_sql_query('SELECT * FROM sections' + where
+                             + ' ORDER BY params, lithology, xs_number, xs_id', conn, params = args)
+
+def read_inflections(conn, lithology = None, params = None, spacing = None):
+    """Return inflection rows, optionally filtered as for read_sections or
+    to one sampling interval [m]."""
+    where, args = _where(lithology = lithology, params = params, spacing = spacing)
+    return pd.read_sql_query('SELECT * FROM inflections' + where
+                             + ' ORDER BY params, lithology, xs_id, spacing', conn, params = args)
+
+def read_elevations(conn, lithology, params):
+    """Return a dict mapping XS_ID to its trimmed elevations [m], in XS_Number
+    order, for one lithology and parameter set."""
+    rows = conn.execute('SELECT e.xs_id, e.z FROM elevations e JOIN sections s '
+                        'ON e.xs_id = s.xs_id AND e.params = s.params '
+                        'WHERE e.lithology = ? AND e.params = ? ORDER BY s.xs_number, s.xs_id',
+                        (lithology, params))
+    return {xs_id: np.frombuffer(z, dtype = '<f8') for xs_id, z in rows}
+
+def lithology_averages(conn, params):
+    """Return mean inflection count and frequency by lithology and sampling
+    interval for one parameter set (the Figure 12 averages)."""
+    return pd.read_sql_query('SELECT lithology, spacing, AVG(count) AS mean_count, '
+                             'AVG(frequency) AS mean_frequency FROM inflections '
+                             'WHERE params = ? GROUP BY lithology, spacing '
+                             'ORDER BY lithology, spacing', conn, params = [params])
+
+def read_roughness(conn, params):
+    """Return the inflection counts of one parameter set as a dict in the 
+    form of analyze_roughness's output, which plot_roughness accepts.
+
+    Sections are ordered by lithology (as in LITHOLOGIES) and XS_Number. 
+    The dict holds 'spacings', 'inflection_data', 'xs_lengths', 
+    'inflection_frequency', 'lithologies', the mean counts (e.g. 
+    'carb_averages_raw') and frequencies (e.g. 'carb_averages') in each 
+    lithology, and the 'dx', 'precision', and 'smoothing' of the parameter 
+    set.
+    """
+    sections = read_sections(conn, params = params)
+    if len(sections) == 0:
+        raise ValueError('no sections in the catalog for parameter set ' + params)
+    lith_order = sections['lithology'].map({lith: k for k, lith in enumerate(LITHOLOGIES)})
+    sections = sections.assign(lith_order = lith_order).sort_values(by = ['lith_order', 'xs_number', 'xs_id'])
+    inflections = read_inflections(conn, params = params)
+    counts = inflections.pivot(index = 'spacing', columns = 'xs_id', values = 'count')
+    frequency = inflections.pivot(index = 'spacing', columns = 'xs_id', values = 'frequency')
+
+    lithologies = sections['lithology'].to_numpy()
+    inflection_data = counts[sections['xs_id']].to_numpy(dtype = float)
+    inflection_frequency = frequency[sections['xs_id']].to_numpy(dtype = float)
+    key = json.loads(params)
+    results = {'spacings': counts.index.to_numpy(),
+               'inflection_data': inflection_data,
+               'xs_lengths': sections['xs_length'].to_numpy(),
+               'inflection_frequency': inflection_frequency,
+               'lithologies': lithologies,
+               'dx': key['dx'], 'precision': key['precision'],
+               'smoothing': tuple(key['smoothing'])}
+    #average over the cross-sections in each lithology, as summarize_roughness
+    start = 0
+    for lith in pd.unique(lithologies):
+        stop = start + np.sum(lithologies == lith)
+        results[lith + '_averages_raw'] = np.mean(inflection_data[:, start:stop], axis = 1)
+        results[lith + '_averages'] = np.mean(inflection_frequency[:, start:stop], axis = 1)
+        start = stop
+    return results
+
+if __name__ == '__main__':
+    conn = open_catalog()
+    params = write_metrics(conn, load_cross_sections(), prune = True)
+    print(read_sections(conn, params = params)[['xs_id', 'lithology', 'xs_length', 'max_z', 'bank_z']].to_string(index = False))
+    conn.close()
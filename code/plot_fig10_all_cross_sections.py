@@ -15,149 +15,125 @@ Please cite the code repository and/or paper if you use this code.
 """
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 
-#import cross-section survey data#############################################
-path = '../data/cross_section_form/'
-
-#import carbonate cross-section survey data
-carb1 = pd.read_csv(path + 'DFC_1.csv')
-carb2 = pd.read_csv(path + 'DFC_2.csv')
-carb3 = pd.read_csv(path + 'DFC_3.csv')
-carb4 = pd.read_csv(path + 'DFC_4.csv')
-carb5 = pd.read_csv(path + 'DFC_5.csv')
-carb6 = pd.read_csv(path + 'DFC_6.csv')
-carb7 = pd.read_csv(path + 'DFC_7.csv')
-carb8 = pd.read_csv(path + 'DFC_8.csv')
-carb9 = pd.read_csv(path + 'DFC_9.csv')
-carb10 = pd.read_csv(path + 'DFC_10.csv')
-
-#import fine sandstone cross-section survey data
-fine1 = pd.read_csv(path + 'DFSSF_1.csv')
-fine2 = pd.read_csv(path + 'DFSSF_2.csv')
-fine3 = pd.read_csv(path + 'DFSSF_3.csv')
-fine4 = pd.read_csv(path + 'DFSSF_4.csv')
-fine5 = pd.read_csv(path + 'DFSSF_5.csv')
-fine6 = pd.read_csv(path + 'DFSSF_6.csv')
-fine7 = pd.read_csv(path + 'DFSSF_7.csv')
-fine8 = pd.read_csv(path + 'DFSSF_8.csv')
-fine9 = pd.read_csv(path + 'DFSSF_9.csv')
-fine10 = pd.read_csv(path + 'DFSSF_10.csv')
-
-#import coarse sandstone cross-section survey data
-coarse1 = pd.read_csv(path + 'DFSSC_1.csv')
-coarse2 = pd.read_csv(path + 'DFSSC_2.csv')
-coarse3 = pd.read_csv(path + 'DFSSC_3.csv')
-coarse4 = pd.read_csv(path + 'DFSSC_4.csv')
-coarse5 = pd.read_csv(path + 'DFSSC_5.csv')
-coarse6 = pd.read_csv(path + 'DFSSC_6.csv')
-coarse7 = pd.read_csv(path + 'DFSSC_7.csv')
-coarse8 = pd.read_csv(path + 'DFSSC_8.csv')
-coarse9 = pd.read_csv(path + 'DFSSC_9.csv')
-coarse10 = pd.read_csv(path + 'DFSSC_10.csv')
-
-list_of_dfs_carb = [carb1, carb2, carb3, carb4, carb5, 
-                    carb6, carb7, carb8, carb9, carb10]
-list_of_dfs_coarse = [coarse1, coarse2, coarse3, coarse4, coarse5, 
-                      coarse6, coarse7, coarse8, coarse9, coarse10]
-list_of_dfs_fine = [fine1, fine2, fine3, fine4, fine5, 
-                    fine6, fine7, fine8, fine9, fine10]
-list_of_dfs = list_of_dfs_carb + list_of_dfs_coarse + list_of_dfs_fine
-
-for df in list_of_dfs:
-    if df['Position'].is_monotonic_increasing == False:
-        df.sort_values('Position', inplace = True)
-        df.reset_index(drop = True, inplace = True)
-
-#create Figure 10: all channel cross-sections#################################
-
-#plot only some of the XSs
-n_rows = 10 #number of rows in the figure
-to_plot = np.arange(0, n_rows)
-list_of_dfs_carb = [carb1, carb2, carb3, carb4, carb5, carb6, carb7, carb8, carb9, carb10]
-list_of_dfs_coarse = [coarse1, coarse2, coarse3, coarse4, coarse5, coarse6, coarse7, coarse8, coarse9, coarse10]
-list_of_dfs_fine = [fine1, fine2, fine3, fine4, fine5, fine6, fine7, fine8, fine9, fine10]
-
-fig, axs = plt.subplots(n_rows, 3, figsize= (10, n_rows * 0.75))
-#fig.patch.set_alpha(0.)
-markersize = 3
-for i in to_plot:
+from cross_sections import load_cross_sections
+from figure_io import save_figure
+
+#axis limits [m] of Figure 10 in the paper; the tallest banks are drawn past 
+#the top of their panels
+PAPER_XLIM = (0, 57)
+PAPER_YLIM = (0, 3)
+
+def plot_cross_sections(sections, n_rows = None, xlim = None, ylim = None):
+    """Make Figure 10 from the output of load_cross_sections; return the figure.
+
+    The first n_rows cross-sections of each lithology are plotted, by default
+    as many as the lithology with the most cross-sections has; panels past
+    the end of a shorter lithology are left blank. Every panel shares xlim 
+    and ylim, which by default span all plotted cross-sections (rounded up 
+    to whole metres); pass PAPER_XLIM and PAPER_YLIM to reproduce the paper.
+    """
+    #plot only some of the XSs
+    if n_rows is None:
+        n_rows = max(len(sections[lith]) for lith in sections)
+    to_plot = np.arange(0, n_rows)
+    list_of_dfs_carb = sections['carb']
+    list_of_dfs_coarse = sections['coarse']
+    list_of_dfs_fine = sections['fine']
+
+    #axis limits fit the largest cross-section
+    all_dfs = [df for lith in sections for df in sections[lith][:n_rows]]
+    if xlim is None:
+        xlim = (min(0, np.floor(min(df['Position'].min() for df in all_dfs))),
+                np.ceil(max(df['Position'].max() for df in all_dfs)))
+    if ylim is None:
+        ylim = (0, np.ceil(max(df['Normalized_Z'].max() for df in all_dfs)))
+
+    fig, axs = plt.subplots(n_rows, 3, figsize= (10, n_rows * 0.75), squeeze = False)
+    #fig.patch.set_alpha(0.)
+    markersize = 3
+    for i in to_plot:
     
 
-    axcarb = axs[i, 0]
-    axcarb.plot(list_of_dfs_carb[i]['Position'], 
-                list_of_dfs_carb[i]['Normalized_Z'], 
-                color = 'lightblue', linewidth = 3, 
-                zorder = 1, clip_on=False)
-    axcarb.scatter(list_of_dfs_carb[i]['Position'], 
-                   list_of_dfs_carb[i]['Normalized_Z'], 
-                   color = 'k', s = markersize, 
-                   zorder = 2, clip_on=False)
-    axcarb.spines['top'].set_visible(False)
-    axcarb.set_yticks(np.arange(0, 3, 1))
-    axcarb.patch.set_alpha(0)
+        axcarb = axs[i, 0]
+        if i < len(list_of_dfs_carb):
+            axcarb.plot(list_of_dfs_carb[i]['Position'], 
+                        list_of_dfs_carb[i]['Normalized_Z'], 
+                        color = 'lightblue', linewidth = 3, 
+                        zorder = 1, clip_on=False)
+            axcarb.scatter(list_of_dfs_carb[i]['Position'], 
+                           list_of_dfs_carb[i]['Normalized_Z'], 
+                           color = 'k', s = markersize, 
+                           zorder = 2, clip_on=False)
+        axcarb.spines['top'].set_visible(False)
+        axcarb.set_yticks(np.arange(0, ylim[1], 1))
+        axcarb.patch.set_alpha(0)
     
-    axcoarse = axs[i, 1]
-    axcoarse.plot(list_of_dfs_coarse[i]['Position'], 
-                  list_of_dfs_coarse[i]['Normalized_Z'], 
-                  color = 'moccasin', linewidth = 3, 
-                  zorder = 1, clip_on=False)
-    axcoarse.scatter(list_of_dfs_coarse[i]['Position'], 
-                     list_of_dfs_coarse[i]['Normalized_Z'], 
-                     color = 'k', s = markersize, 
-                     zorder = 2, clip_on=False)
-    axcoarse.spines['top'].set_visible(False)
-    axcoarse.patch.set_alpha(0)
+        axcoarse = axs[i, 1]
+        if i < len(list_of_dfs_coarse):
+            axcoarse.plot(list_of_dfs_coarse[i]['Position'], 
+                          list_of_dfs_coarse[i]['Normalized_Z'], 
+                          color = 'moccasin', linewidth = 3, 
+                          zorder = 1, clip_on=False)
+            axcoarse.scatter(list_of_dfs_coarse[i]['Position'], 
+                             list_of_dfs_coarse[i]['Normalized_Z'], 
+                             color = 'k', s = markersize, 
+                             zorder = 2, clip_on=False)
+        axcoarse.spines['top'].set_visible(False)
+        axcoarse.patch.set_alpha(0)
     
-    axfine = axs[i, 2]
-    axfine.plot(list_of_dfs_fine[i]['Position'], 
-                list_of_dfs_fine[i]['Normalized_Z'], 
-                color = 'moccasin', linewidth = 3, 
-                zorder = 1, clip_on=False)
-    axfine.scatter(list_of_dfs_fine[i]['Position'], 
-                   list_of_dfs_fine[i]['Normalized_Z'], 
-                   color = 'k', s = markersize, 
-                   zorder = 2, clip_on=False)
-    axfine.spines['top'].set_visible(False)
-    axfine.patch.set_alpha(0)
+        axfine = axs[i, 2]
+        if i < len(list_of_dfs_fine):
+            axfine.plot(list_of_dfs_fine[i]['Position'], 
+                        list_of_dfs_fine[i]['Normalized_Z'], 
+                        color = 'moccasin', linewidth = 3, 
+                        zorder = 1, clip_on=False)
+            axfine.scatter(list_of_dfs_fine[i]['Position'], 
+                           list_of_dfs_fine[i]['Normalized_Z'], 
+                           color = 'k', s = markersize, 
+                           zorder = 2, clip_on=False)
+        axfine.spines['top'].set_visible(False)
+        axfine.patch.set_alpha(0)
     
-    if i < n_rows - 1:
-        axcarb.get_xaxis().set_visible(False)
-        axcoarse.get_xaxis().set_visible(False)
-        axfine.get_xaxis().set_visible(False)
+        if i < n_rows - 1:
+            axcarb.get_xaxis().set_visible(False)
+            axcoarse.get_xaxis().set_visible(False)
+            axfine.get_xaxis().set_visible(False)
         
-        axcarb.spines['bottom'].set_visible(True)
-        axcoarse.spines['bottom'].set_visible(True)
-        axfine.spines['bottom'].set_visible(True)
+            axcarb.spines['bottom'].set_visible(True)
+            axcoarse.spines['bottom'].set_visible(True)
+            axfine.spines['bottom'].set_visible(True)
         
-        axcarb.get_yaxis().set_visible(True)
+            axcarb.get_yaxis().set_visible(True)
     
-    axcoarse.get_yaxis().set_visible(False)
-    axfine.get_yaxis().set_visible(False)
+        axcoarse.get_yaxis().set_visible(False)
+        axfine.get_yaxis().set_visible(False)
     
-    if i == 0:
-        axcarb.set_title('Carbonate', y = 1, pad = -16, fontsize = 16)
-        axcoarse.set_title('Coarse sandstone', y = 1, pad = -16, fontsize = 16)
-        axfine.set_title('Fine sandstone', y = 1, pad = -16, fontsize = 16)
+        if i == 0:
+            axcarb.set_title('Carbonate', y = 1, pad = -16, fontsize = 16)
+            axcoarse.set_title('Coarse sandstone', y = 1, pad = -16, fontsize = 16)
+            axfine.set_title('Fine sandstone', y = 1, pad = -16, fontsize = 16)
         
-        axcarb.spines['top'].set_visible(True)
-        axcoarse.spines['top'].set_visible(True)
-        axfine.spines['top'].set_visible(True)
+            axcarb.spines['top'].set_visible(True)
+            axcoarse.spines['top'].set_visible(True)
+            axfine.spines['top'].set_visible(True)
         
-        axcarb.set_yticks(np.arange(4))
+            axcarb.set_yticks(np.arange(ylim[1] + 1))
             
-#set all xlims and ylims to the maximum value
-plt.setp(axs, xlim=(0, 57), ylim=(0, 3))
+    #set all xlims and ylims to the maximum value
+    plt.setp(axs, xlim=xlim, ylim=ylim)
 
-plt.tight_layout()
-plt.subplots_adjust(left=None, bottom=None, right=None, top=None, wspace=0, hspace=0.0)
+    plt.tight_layout()
+    plt.subplots_adjust(left=None, bottom=None, right=None, top=None, wspace=0, hspace=0.0)
 
-axcarb.set_ylabel('Elevation above thalweg [m]', fontsize = 16)
-axcarb.yaxis.set_label_coords(-0.1,5)
+    axcarb.set_ylabel('Elevation above thalweg [m]', fontsize = 16)
+    axcarb.yaxis.set_label_coords(-0.1,5)
 
-axcarb.set_xlabel('Distance [m]', fontsize = 16)
-axcarb.xaxis.set_label_coords(1.5,-0.5)
+    axcarb.set_xlabel('Distance [m]', fontsize = 16)
+    axcarb.xaxis.set_label_coords(1.5,-0.5)
+    return fig
 
-fig.savefig('../figures/fig10_all_XSs.png', dpi=1000, bbox_inches = 'tight')
-fig.savefig('../figures/fig10_all_XSs.pdf', dpi=1000, bbox_inches = 'tight')
\ No newline at end of file
+if __name__ == '__main__':
+    fig = plot_cross_sections(load_cross_sections(), xlim = PAPER_XLIM, ylim = PAPER_YLIM)
+    save_figure(fig, 'fig10_all_XSs')
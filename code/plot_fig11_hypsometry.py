@@ -16,141 +16,164 @@ Please cite the code repository and/or paper if you use this code.
 
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
 from scipy.stats import kruskal, mannwhitneyu
 import scikit_posthocs
 
-#define function to linearly interpolate cross-sections to dx resolution
-def densify_xs(df, dx):
-    df = df.sort_values(by = 'Position').reset_index(drop=True)
-    x = df['Position']
-    z = df['Normalized_Z']
-    xnew = np.arange(df.loc[0, 'Position'], df.loc[df.index[-1], 'Position'] + dx, dx)
-    znew = np.interp(xnew, x, z)
-    return xnew, znew
-
-#import cross-section survey data#############################################
-path = '../data/cross_section_form/'
-
-#import carbonate cross-section survey data
-carb1 = pd.read_csv(path + 'DFC_1.csv')
-carb2 = pd.read_csv(path + 'DFC_2.csv')
-carb3 = pd.read_csv(path + 'DFC_3.csv')
-carb4 = pd.read_csv(path + 'DFC_4.csv')
-carb5 = pd.read_csv(path + 'DFC_5.csv')
-carb6 = pd.read_csv(path + 'DFC_6.csv')
-carb7 = pd.read_csv(path + 'DFC_7.csv')
-carb8 = pd.read_csv(path + 'DFC_8.csv')
-carb9 = pd.read_csv(path + 'DFC_9.csv')
-carb10 = pd.read_csv(path + 'DFC_10.csv')
-
-#import fine sandstone cross-section survey data
-fine1 = pd.read_csv(path + 'DFSSF_1.csv')
-fine2 = pd.read_csv(path + 'DFSSF_2.csv')
-fine3 = pd.read_csv(path + 'DFSSF_3.csv')
-fine4 = pd.read_csv(path + 'DFSSF_4.csv')
-fine5 = pd.read_csv(path + 'DFSSF_5.csv')
-fine6 = pd.read_csv(path + 'DFSSF_6.csv')
-fine7 = pd.read_csv(path + 'DFSSF_7.csv')
-fine8 = pd.read_csv(path + 'DFSSF_8.csv')
-fine9 = pd.read_csv(path + 'DFSSF_9.csv')
-fine10 = pd.read_csv(path + 'DFSSF_10.csv')
-
-#import coarse sandstone cross-section survey data
-coarse1 = pd.read_csv(path + 'DFSSC_1.csv')
-coarse2 = pd.read_csv(path + 'DFSSC_2.csv')
-coarse3 = pd.read_csv(path + 'DFSSC_3.csv')
-coarse4 = pd.read_csv(path + 'DFSSC_4.csv')
-coarse5 = pd.read_csv(path + 'DFSSC_5.csv')
-coarse6 = pd.read_csv(path + 'DFSSC_6.csv')
-coarse7 = pd.read_csv(path + 'DFSSC_7.csv')
-coarse8 = pd.read_csv(path + 'DFSSC_8.csv')
-coarse9 = pd.read_csv(path + 'DFSSC_9.csv')
-coarse10 = pd.read_csv(path + 'DFSSC_10.csv')
-
-list_of_dfs_carb = [carb1, carb2, carb3, carb4, carb5, carb6, carb7, carb8, carb9, carb10]
-list_of_dfs_coarse = [coarse1, coarse2, coarse3, coarse4, coarse5, coarse6, coarse7, coarse8, coarse9, coarse10]
-list_of_dfs_fine = [fine1, fine2, fine3, fine4, fine5, fine6, fine7, fine8, fine9, fine10]
-list_of_dfs = list_of_dfs_carb + list_of_dfs_coarse + list_of_dfs_fine
-
-save_carb_elevs = np.array([])
-save_coarse_elevs = np.array([])
-save_fine_elevs = np.array([])
-
-save_carb_elevs_uniform_banks = np.array([])
-save_coarse_elevs_uniform_banks = np.array([])
-save_fine_elevs_uniform_banks = np.array([])
-
-#interpolate cross-sections to dx resolution
-dx = 0.1
-
-for i in range(len(list_of_dfs)):
-    df = list_of_dfs[i]
-    xnew, znew = densify_xs(df, dx)
-
-    #decimate to cut out bank elevations that were not surveyed on both banks
-    if i == 20:
-        sampled_z_uniform_banks = znew[znew < np.minimum(znew[1], znew[-1])]
-    else:
-        sampled_z_uniform_banks = znew[znew < np.minimum(znew[0], znew[-1])]
-
-    
-    if i < 10: #data is carbonate
-        save_carb_elevs = np.concatenate((save_carb_elevs, znew))
-        save_carb_elevs_uniform_banks = np.concatenate((save_carb_elevs_uniform_banks, sampled_z_uniform_banks))
-    elif (i >= 10) and (i < 20):
-        save_coarse_elevs = np.concatenate((save_coarse_elevs, znew))
-        save_coarse_elevs_uniform_banks = np.concatenate((save_coarse_elevs_uniform_banks, sampled_z_uniform_banks))
-    elif i >= 20:
-        save_fine_elevs = np.concatenate((save_fine_elevs, znew))
-        save_fine_elevs_uniform_banks = np.concatenate((save_fine_elevs_uniform_banks, sampled_z_uniform_banks))
-    else:
-        print('no condition satisfied! check code')
-    
-    
-#create Figure 11: cross-section hypsometry#################################
-bins = np.arange(0, 2, 0.1)
-
-fig2, axs2 = plt.subplots(1, 3, figsize = (10, 4))
-ax1 = axs2[0]
-ax2 = axs2[1]
-ax3 = axs2[2]
-bins = np.arange(0, 4, 0.1)
-ax1.hist(save_carb_elevs_uniform_banks, color = 'lightblue', alpha = 1., edgecolor = 'k', label = 'carb', density = True, bins = bins, orientation = 'horizontal', histtype='stepfilled')
-ax2.hist(save_coarse_elevs_uniform_banks, color = 'moccasin', alpha = 1., edgecolor = 'k', label = 'coarse', density = True, bins = bins, orientation = 'horizontal', histtype='stepfilled')
-ax3.hist(save_fine_elevs_uniform_banks, color = 'moccasin', alpha = 1., edgecolor = 'k', label = 'fine', density = True, bins = bins, orientation = 'horizontal', histtype='stepfilled')
-
-
-ax1.set_title('A) Carbonate', y = 1.0, pad = -16, fontsize = 16)
-ax2.set_title('B) Coarse sandstone', y = 1.0, pad = -16, fontsize = 16)
-ax3.set_title('C) Fine sandstone', y = 1.0, pad = -16, fontsize = 16)
-
-ax1.set_xlabel('Density', fontsize = 16)
-ax2.set_xlabel('Density', fontsize = 16)
-ax3.set_xlabel('Density', fontsize = 16)
-
-ax1.set_xlim(0, 1.7)
-ax2.set_xlim(0, 1.7)
-ax3.set_xlim(0, 1.7)
-
-
-ax1.set_xticks(np.arange(0, 2, 0.5))
-ax1.set_yticks(np.arange(0, 4.5, 0.5))
-ax2.set_xticks(np.arange(0, 2, 0.5))
-ax2.set(yticklabels=[])
-ax3.set_xticks(np.arange(0, 2, 0.5))
-ax3.set(yticklabels=[])
-
-ax1.set_ylabel('Elevation above thalweg [m]', fontsize = 16)
-plt.tight_layout()
-fig2.savefig('../figures/fig11_xs_hypsometry.png', dpi = 1000, bbox_inches = 'tight')
-fig2.savefig('../figures/fig11_xs_hypsometry.pdf', dpi = 1000, bbox_inches = 'tight')
-
-
-#statistical testing to assess whether distributions differ among rock units
-kw = kruskal(save_carb_elevs_uniform_banks, save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks)
-dunns = scikit_posthocs.posthoc_dunn([save_carb_elevs_uniform_banks, save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks], p_adjust = 'bonferroni')
-
-#combine coarse and fine sandstone data to assess carbonate versus sandstone
-all_ss_elevs_uniform_banks = np.concatenate((save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks), axis = 0)
-mwu = mannwhitneyu(save_carb_elevs_uniform_banks, all_ss_elevs_uniform_banks)
+from cross_sections import load_cross_sections, densify_xs, PRECISIONS
+from figure_io import save_figure
+
+#index of the densified point used as the left bank when trimming bank 
+#elevations, by XS_ID, for this repository's sections where it is not the 
+#first point
+BANK_OVERRIDES = {'DFSS_1': 1}
+
+#elevation bins [m] of the Figure 11 histograms
+BINS = np.arange(0, 4, 0.1)
+
+def trim_banks(znew, left = 0):
+    """Keep densified elevations below the lower of the two bank elevations.
+
+    left is the index of the point used as the left bank; the right bank is
+    the last point. This cuts out bank elevations that were not surveyed on
+    both banks.
+    """
+    return znew[znew < np.minimum(znew[left], znew[-1])]
+
+def analyze_hypsometry(sections, dx = 0.1, bank_overrides = BANK_OVERRIDES,
+                       precision = 'float64'):
+    """Collect densified elevations by lithology and run the Figure 11 tests.
+
+    Each cross-section is interpolated to dx resolution and trimmed to 
+    elevations below the lower of its two banks. bank_overrides maps XS_ID 
+    to the index of the point used as the left bank (see trim_banks) for 
+    sections where it is not the first point. Returns a dict holding the 
+    concatenated elevations for each lithology (e.g. 'save_carb_elevs') and 
+    their bank-trimmed counterparts (e.g. 'save_carb_elevs_uniform_banks'), 
+    along with the Kruskal-Wallis ('kw'), Dunn's ('dunns'), and carbonate 
+    versus sandstone Mann-Whitney U ('mwu') tests on the trimmed elevations.
+    Densified and concatenated elevations are stored at the given precision 
+    (see cross_sections.PRECISIONS).
+    """
+    z_dtype = PRECISIONS[precision][1]
+    results = {'dx': dx, 'precision': precision}
+    for lith in sections:
+        save_elevs = np.array([], dtype = z_dtype)
+        save_elevs_uniform_banks = np.array([], dtype = z_dtype)
+        for i, df in enumerate(sections[lith]):
+            xnew, znew = densify_xs(df, dx, precision = precision)
+
+            #decimate to cut out bank elevations that were not surveyed on both banks
+            sampled_z_uniform_banks = trim_banks(znew, bank_overrides.get(df['XS_ID'].iloc[0], 0))
+
+            save_elevs = np.concatenate((save_elevs, znew))
+            save_elevs_uniform_banks = np.concatenate((save_elevs_uniform_banks, sampled_z_uniform_banks))
+        results['save_' + lith + '_elevs'] = save_elevs
+        results['save_' + lith + '_elevs_uniform_banks'] = save_elevs_uniform_banks
+
+    save_carb_elevs_uniform_banks = results['save_carb_elevs_uniform_banks']
+    save_coarse_elevs_uniform_banks = results['save_coarse_elevs_uniform_banks']
+    save_fine_elevs_uniform_banks = results['save_fine_elevs_uniform_banks']
+
+    #statistical testing to assess whether distributions differ among rock units
+    results['kw'] = kruskal(save_carb_elevs_uniform_banks, save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks)
+    results['dunns'] = scikit_posthocs.posthoc_dunn([save_carb_elevs_uniform_banks, save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks], p_adjust = 'bonferroni')
+
+    #combine coarse and fine sandstone data to assess carbonate versus sandstone
+    all_ss_elevs_uniform_banks = np.concatenate((save_coarse_elevs_uniform_banks, save_fine_elevs_uniform_banks), axis = 0)
+    results['mwu'] = mannwhitneyu(save_carb_elevs_uniform_banks, all_ss_elevs_uniform_banks)
+    return results
+
+def exact_hypsometry(sections, bins = BINS, bank_overrides = BANK_OVERRIDES, 
+                     dx = 0.1):
+    """Compute cross-section hypsometry exactly, without densification.
+
+    Each surveyed profile is piecewise linear between survey points, so the 
+    horizontal length of each segment lying in each elevation bin follows 
+    in closed form. Elevations are trimmed below the lower of the two banks 
+    as in analyze_hypsometry (bank_overrides index densified points spaced 
+    dx apart, as there). Cost scales with the number of survey points.
+
+    Returns a dict holding the bins, the length [m] of each cross-section in 
+    each bin for each lithology (e.g. 'carb_occupancy', n_sections x 
+    n_bins), and the normalized density of each lithology (e.g. 
+    'carb_density'), which is the limit of the Figure 11 histograms as dx 
+    goes to zero.
+    """
+    results = {'bins': bins}
+    for lith in sections:
+        #gather every segment of every cross-section in this lithology
+        z0, z1, lengths, section, thresholds = [], [], [], [], []
+        for i, df in enumerate(sections[lith]):
+            df = df.sort_values(by = 'Position')
+            x = df['Position'].to_numpy(dtype = float)
+            z = df['Normalized_Z'].to_numpy(dtype = float)
+            left = bank_overrides.get(df['XS_ID'].iloc[0], 0)
+            thresholds.append(min(np.interp(x[0] + left * dx, x, z), z[-1]))
+            z0.append(z[:-1])
+            z1.append(z[1:])
+            lengths.append(np.diff(x))
+            section.append(np.full(len(x) - 1, i))
+        z0, z1 = np.concatenate(z0), np.concatenate(z1)
+        lengths, section = np.concatenate(lengths), np.concatenate(section)
+        thresholds = np.array(thresholds)
+
+        #length of each segment lying below each (trimmed) bin edge
+        zlo = np.minimum(z0, z1)[:, None]
+        zhi = np.maximum(z0, z1)[:, None]
+        edges = np.minimum(bins[None, :], thresholds[section][:, None])
+        span = zhi - zlo
+        flat = span == 0
+        below = np.where(flat, (zlo < edges).astype(float), 
+                         np.clip((edges - zlo) / np.where(flat, 1, span), 0, 1))
+        below *= lengths[:, None]
+
+        occupancy = np.zeros((len(sections[lith]), len(bins) - 1))
+        np.add.at(occupancy, section, np.diff(below, axis = 1))
+        total = occupancy.sum(axis = 0)
+        results[lith + '_occupancy'] = occupancy
+        results[lith + '_density'] = total / (total.sum() * np.diff(bins))
+    return results
+
+def plot_hypsometry(results):
+    """Make Figure 11 from the output of analyze_hypsometry or 
+    exact_hypsometry; return the figure."""
+    fig2, axs2 = plt.subplots(1, 3, figsize = (10, 4))
+    ax1 = axs2[0]
+    ax2 = axs2[1]
+    ax3 = axs2[2]
+    colors = {'carb': 'lightblue', 'coarse': 'moccasin', 'fine': 'moccasin'}
+    for ax, lith in zip(axs2, ['carb', 'coarse', 'fine']):
+        if lith + '_density' in results:
+            ax.stairs(results[lith + '_density'], results['bins'], facecolor = colors[lith], alpha = 1., edgecolor = 'k', linewidth = 1., label = lith, orientation = 'horizontal', fill = True)
+        else:
+            ax.hist(results['save_' + lith + '_elevs_uniform_banks'], color = colors[lith], alpha = 1., edgecolor = 'k', label = lith, density = True, bins = BINS, orientation = 'horizontal', histtype='stepfilled')
+
+
+    ax1.set_title('A) Carbonate', y = 1.0, pad = -16, fontsize = 16)
+    ax2.set_title('B) Coarse sandstone', y = 1.0, pad = -16, fontsize = 16)
+    ax3.set_title('C) Fine sandstone', y = 1.0, pad = -16, fontsize = 16)
+
+    ax1.set_xlabel('Density', fontsize = 16)
+    ax2.set_xlabel('Density', fontsize = 16)
+    ax3.set_xlabel('Density', fontsize = 16)
+
+    ax1.set_xlim(0, 1.7)
+    ax2.set_xlim(0, 1.7)
+    ax3.set_xlim(0, 1.7)
+
+
+    ax1.set_xticks(np.arange(0, 2, 0.5))
+    ax1.set_yticks(np.arange(0, 4.5, 0.5))
+    ax2.set_xticks(np.arange(0, 2, 0.5))
+    ax2.set(yticklabels=[])
+    ax3.set_xticks(np.arange(0, 2, 0.5))
+    ax3.set(yticklabels=[])
+
+    ax1.set_ylabel('Elevation above thalweg [m]', fontsize = 16)
+    plt.tight_layout()
+    return fig2
+
+if __name__ == '__main__':
+    results = analyze_hypsometry(load_cross_sections())
+    fig = plot_hypsometry(results)
+    save_figure(fig, 'fig11_xs_hypsometry')
@@ -14,176 +14,326 @@ Please cite the code repository and/or paper if you use this code.
 @author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
 """
 import numpy as np
-import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
 
-def densify_xs(df, dx):
-    df = df.sort_values(by = 'Position').reset_index(drop=True)
-    x = df['Position']
-    z = df['Normalized_Z']
-    xnew = np.arange(df.loc[0, 'Position'], df.loc[df.index[-1], 'Position'] + dx, dx)
-    znew = np.interp(xnew, x, z)
-    return xnew, znew
-
-#import cross-section survey data#############################################
-path = '../data/cross_section_form/'
-
-#import carbonate cross-section survey data
-carb1 = pd.read_csv(path + 'DFC_1.csv')
-carb2 = pd.read_csv(path + 'DFC_2.csv')
-carb3 = pd.read_csv(path + 'DFC_3.csv')
-carb4 = pd.read_csv(path + 'DFC_4.csv')
-carb5 = pd.read_csv(path + 'DFC_5.csv')
-carb6 = pd.read_csv(path + 'DFC_6.csv')
-carb7 = pd.read_csv(path + 'DFC_7.csv')
-carb8 = pd.read_csv(path + 'DFC_8.csv')
-carb9 = pd.read_csv(path + 'DFC_9.csv')
-carb10 = pd.read_csv(path + 'DFC_10.csv')
-
-#import fine sandstone cross-section survey data
-fine1 = pd.read_csv(path + 'DFSSF_1.csv')
-fine2 = pd.read_csv(path + 'DFSSF_2.csv')
-fine3 = pd.read_csv(path + 'DFSSF_3.csv')
-fine4 = pd.read_csv(path + 'DFSSF_4.csv')
-fine5 = pd.read_csv(path + 'DFSSF_5.csv')
-fine6 = pd.read_csv(path + 'DFSSF_6.csv')
-fine7 = pd.read_csv(path + 'DFSSF_7.csv')
-fine8 = pd.read_csv(path + 'DFSSF_8.csv')
-fine9 = pd.read_csv(path + 'DFSSF_9.csv')
-fine10 = pd.read_csv(path + 'DFSSF_10.csv')
-
-#import coarse sandstone cross-section survey data
-coarse1 = pd.read_csv(path + 'DFSSC_1.csv')
-coarse2 = pd.read_csv(path + 'DFSSC_2.csv')
-coarse3 = pd.read_csv(path + 'DFSSC_3.csv')
-coarse4 = pd.read_csv(path + 'DFSSC_4.csv')
-coarse5 = pd.read_csv(path + 'DFSSC_5.csv')
-coarse6 = pd.read_csv(path + 'DFSSC_6.csv')
-coarse7 = pd.read_csv(path + 'DFSSC_7.csv')
-coarse8 = pd.read_csv(path + 'DFSSC_8.csv')
-coarse9 = pd.read_csv(path + 'DFSSC_9.csv')
-coarse10 = pd.read_csv(path + 'DFSSC_10.csv')
-
-list_of_dfs_carb = [carb1, carb2, carb3, carb4, carb5, 
-                    carb6, carb7, carb8, carb9, carb10]
-list_of_dfs_coarse = [coarse1, coarse2, coarse3, coarse4, coarse5, 
-                      coarse6, coarse7, coarse8, coarse9, coarse10]
-list_of_dfs_fine = [fine1, fine2, fine3, fine4, fine5, 
-                    fine6, fine7, fine8, fine9, fine10]
-list_of_dfs = list_of_dfs_carb + list_of_dfs_coarse + list_of_dfs_fine
-
-for df in list_of_dfs:
-    if df['Position'].is_monotonic_increasing == False:
-        df.sort_values('Position', inplace = True)
-        df.reset_index(drop = True, inplace = True)
-
-#interpolate cross-sections to dx resolution, then resample to 
-#a number of different sample_spacings, finding inflection points each time
-
-#iterate through resampling scales (will be x-axis of plot ultimately)
-spacings = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,  
+from cross_sections import (load_cross_sections, flatten_sections, densify_xs, 
+                            positions_mm, stack_profiles, smooth_stack, 
+                            smooth_profiles)
+from figure_io import save_figure
+
+#resampling scales [m] (will be x-axis of plot ultimately)
+SPACINGS = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,  
                      1., 1.5, 2., 2.5, 3., 3.5, 4., 4.5, 5., 5.5, 6., 6.5, 7., 
                      7.5, 8., 8.5, 9., 9.5, 10.])
 
-#create data structure to hold output: n_spacings x n_dfs
-inflection_data = np.zeros((len(spacings), len(list_of_dfs)))
-
-dx = 0.1
-
-for j in range(len(spacings)):
-    #iterate through the 30 cross-sections, calculating the number of inflection 
-    #points in each one (at a given resampling scale)
-    for i in range(len(list_of_dfs)):
-        sample_spacing = spacings[j]
-        df = list_of_dfs[i]
-        xnew, znew = densify_xs(df, dx)
+#smoothing filters applied ahead of inflection counting by 
+#analyze_roughness_filter_bank: (method, window width [m]); see 
+#cross_sections.smooth_stack. Savitzky-Golay filters are left out because 
+#they add wiggles at the kinks of densified profiles
+FILTER_BANK = [('none', 0.),
+               ('median', 0.5), ('median', 1.), ('median', 2.),
+               ('gaussian', 0.5), ('gaussian', 1.), ('gaussian', 2.)]
+
+#elevation steps [m] no larger than this count as flat when only slope 
+#reversals are counted; smoothing filters leave round-off of ~1e-16 m on 
+#straight stretches of a profile
+FLAT_TOLERANCE = 1e-6
+
+def _count_reversals(z):
+    #number of changes between rising and falling along z, ignoring flat steps
+    slopes = np.diff(z)
+    signs = np.sign(slopes[np.abs(slopes) > FLAT_TOLERANCE])
+    return np.count_nonzero(np.diff(signs) != 0)
+
+def count_inflections(profiles, spacings = SPACINGS, precision = 'float64',
+                      reversals_only = False):
+    """Count inflection points in densified cross-sections at each spacing.
+
+    profiles is a list of (xnew, znew) pairs from densify_xs. Returns the 
+    n_spacings x n_profiles array of inflection counts. By default every 
+    change in the sign of the slope is counted, as in Figure 12, so a flat 
+    stretch between two rises counts twice. If reversals_only is True, flat 
+    steps (up to FLAT_TOLERANCE) are dropped first, so only changes between 
+    rising and falling are counted; use this for smoothed profiles, since a 
+    moving median turns noise into flat plateaus.
+    """
+    #create data structure to hold output: n_spacings x n_dfs
+    inflection_data = np.zeros((len(spacings), len(profiles)))
+
+    for j in range(len(spacings)):
+        #iterate through the cross-sections, calculating the number of inflection 
+        #points in each one (at a given resampling scale)
+        for i in range(len(profiles)):
+            sample_spacing = spacings[j]
+            xnew, znew = profiles[i]
         
-        #sample densified xs at known spacing
-        factor = 100
-        sample_spacing *= factor
-        xnew *= factor
-        sampled_x = xnew[np.isclose(xnew % sample_spacing, 0, atol=1e-3)]
-        sampled_x /= factor
+            #sample densified xs at known spacing
+            if precision == 'float64':
+                factor = 100
+                sample_spacing *= factor
+                xnew = xnew * factor
+                sampled_x = xnew[np.isclose(xnew % sample_spacing, 0, atol=1e-3)]
+                sampled_x /= factor
         
-        sampled_z = znew[np.isclose(xnew % sample_spacing, 0, atol=1e-3)]
+                sampled_z = znew[np.isclose(xnew % sample_spacing, 0, atol=1e-3)]
+            else:
+                x_mm = positions_mm(xnew, precision)
+                sampled_z = znew[x_mm % int(round(sample_spacing * 1000)) == 0]
         
-        # find inflection points
-        infls = np.where(np.diff(np.sign(np.diff(sampled_z))) != 0)[0]
-        infls += 1
-
-        inflection_data[j, i] = len(infls)
-
-xs_lengths = np.zeros(30)
-iter = 0
-for df in list_of_dfs:
-    xs_lengths[iter] = df.loc[df.index[-1], 'Position']
-    iter += 1
+            # find inflection points
+            if reversals_only:
+                inflection_data[j, i] = _count_reversals(sampled_z)
+                continue
+            infls = np.where(np.diff(np.sign(np.diff(sampled_z))) != 0)[0]
+            infls += 1
+
+            inflection_data[j, i] = len(infls)
+    return inflection_data
+
+def summarize_roughness(sections, inflection_data):
+    """Normalize inflection counts by section length and average by lithology."""
+    list_of_dfs = flatten_sections(sections)
+    xs_lengths = np.zeros(len(list_of_dfs))
+    for i, df in enumerate(list_of_dfs):
+        xs_lengths[i] = df.loc[df.index[-1], 'Position']
     
-inflection_frequency = np.divide(inflection_data, xs_lengths)
-
-carb_averages_raw = np.mean(inflection_data[:, 0:10], axis = 1)
-coarse_averages_raw = np.mean(inflection_data[:, 10:20], axis = 1)
-fine_averages_raw = np.mean(inflection_data[:, 20:30], axis = 1)
-
-carb_averages = np.mean(inflection_frequency[:, 0:10], axis = 1)
-coarse_averages = np.mean(inflection_frequency[:, 10:20], axis = 1)
-fine_averages = np.mean(inflection_frequency[:, 20:30], axis = 1)
-
-
-#create Figure 12: cross-section roughness#################################
-
-fig, axs = plt.subplots(1, 1, figsize = (6, 4.5))
-
-edgecolor = matplotlib.colors.ColorConverter().to_rgba('k', alpha=0.2)
-markersize = 100
-
-carb_facecolor = matplotlib.colors.ColorConverter().to_rgba('lightblue', 
-                                                            alpha = 0.2)
-carb_zorder = 5
-
-
-coarse_facecolor = matplotlib.colors.ColorConverter().to_rgba('moccasin', 
-                                                              alpha = 0.2)
-coarse_zorder = 4
-
-
-fine_facecolor = matplotlib.colors.ColorConverter().to_rgba('moccasin', 
-                                                            alpha = 0.2)
-fine_alpha = 0.5
-fine_zorder = 3
-
-averages = axs
-
-averages.scatter(spacings, carb_averages, s = 100, color = carb_facecolor, 
-                 marker = '^', alpha = 1., edgecolor = 'k', zorder = 3, 
-                 label = 'Carbonate', clip_on = False)
-averages.scatter(spacings, coarse_averages, s = 100, color = coarse_facecolor, 
-                 marker = 'o', alpha = 1., edgecolor = 'k', zorder = 3, 
-                 label = 'Coarse sandstone', clip_on = False)
-averages.scatter(spacings, fine_averages, s = 100, color = fine_facecolor, 
-                 marker = 's', alpha = 1., edgecolor = 'k', zorder = 3, 
-                 label = 'Fine sandstone', clip_on = False)
-
-averages.text(-1.7, 0.23, 'rougher' '\n' 'boundary', style = 'italic')
-averages.text(-1.7, 0.0, 'smoother' '\n' 'boundary', style = 'italic')
-
-
-averages.set_xlabel('Sampling interval [m]', fontsize = 16)
-averages.set_ylabel('Inflection frequency [m$^{-1}$]', fontsize = 16)
-
-handles, labels = averages.get_legend_handles_labels()
-averages.legend(handles[::-1], labels[::-1], loc='upper right', 
-                edgecolor = 'k')
-
-averages.set_xlim(0, 10)
-
-averages.axvspan(0.2, 3, alpha = 0.5, color = 'gray')
-averages.text(1, 0.02, 
-              'typical' + '\n' 'surveyed' + '\n' + 'point' + '\n' + 'spacing')
-
-plt.tight_layout()
-fig.savefig('../figures/fig12_xs_roughness.png', dpi = 1000, 
-            bbox_inches = 'tight')
-fig.savefig('../figures/fig12_xs_roughness.pdf', dpi = 1000, 
-            bbox_inches = 'tight')
\ No newline at end of file
+    inflection_frequency = np.divide(inflection_data, xs_lengths)
+
+    lithologies = np.array([lith for lith in sections for df in sections[lith]])
+
+    results = {'inflection_data': inflection_data, 'xs_lengths': xs_lengths,
+               'inflection_frequency': inflection_frequency,
+               'lithologies': lithologies}
+
+    #average over the cross-sections in each lithology
+    start = 0
+    for lith in sections:
+        stop = start + len(sections[lith])
+        results[lith + '_averages_raw'] = np.mean(inflection_data[:, start:stop], axis = 1)
+        results[lith + '_averages'] = np.mean(inflection_frequency[:, start:stop], axis = 1)
+        start = stop
+    return results
+
+def analyze_roughness(sections, spacings = SPACINGS, dx = 0.1, 
+                      precision = 'float64', smoothing = ('none', 0.), 
+                      reversals_only = None):
+    """Count inflection points in each cross-section at each sampling scale.
+
+    Each cross-section is interpolated to dx resolution, optionally smoothed 
+    (smoothing is a (method, width) pair; see cross_sections.smooth_stack), 
+    then resampled to each of the sample spacings, finding inflection points 
+    each time. Returns a dict holding the n_spacings x n_sections 
+    'inflection_data' counts, the cross-section lengths 'xs_lengths', the 
+    'inflection_frequency' counts per metre, the lithology of each 
+    cross-section 'lithologies', and the mean counts (e.g. 
+    'carb_averages_raw') and frequencies (e.g. 'carb_averages') in each 
+    lithology.
+
+    Densified cross-sections are stored at the given precision (see 
+    cross_sections.PRECISIONS). At reduced precision, samples are selected 
+    on integer millimetre positions rather than by floating-point modulo.
+    reversals_only is passed to count_inflections; by default it is True 
+    for smoothed profiles and False otherwise.
+    """
+    if reversals_only is None:
+        reversals_only = smoothing[0] != 'none'
+    profiles = [densify_xs(df, dx, precision = precision) 
+                for df in flatten_sections(sections)]
+    profiles = smooth_profiles(profiles, smoothing[0], smoothing[1], dx)
+    results = summarize_roughness(sections, count_inflections(profiles, spacings, precision,
+                                                              reversals_only))
+    results.update({'spacings': spacings, 'dx': dx, 'precision': precision,
+                    'smoothing': smoothing, 'reversals_only': reversals_only})
+    return results
+
+def exact_roughness(sections, spacings = SPACINGS, reversals_only = False):
+    """Count inflection points exactly, without densification.
+
+    Each surveyed profile is piecewise linear between survey points, so its 
+    elevation at every multiple of each spacing follows directly from the 
+    two survey points around it; inflections are then counted as in 
+    count_inflections. Samples are taken at exact multiples of the spacing 
+    (in integer millimetres) within the surveyed extent. Counts can differ 
+    from those of analyze_roughness where its dx grid runs past the last 
+    survey point: the sample there repeats the end elevation (3 of the 840 
+    counts for this repository's data).
+
+    Returns a dict in the form of analyze_roughness's output, which 
+    plot_roughness accepts, with 'vertex_inflections' added: the number of 
+    slope reversals between the surveyed points of each cross-section 
+    (flat steps up to FLAT_TOLERANCE dropped), which is the count in the 
+    limit of small spacing.
+    """
+    list_of_dfs = flatten_sections(sections)
+    inflection_data = np.zeros((len(spacings), len(list_of_dfs)))
+    vertex_inflections = np.zeros(len(list_of_dfs))
+    for i, df in enumerate(list_of_dfs):
+        df = df.sort_values(by = 'Position')
+        x = df['Position'].to_numpy(dtype = float)
+        z = df['Normalized_Z'].to_numpy(dtype = float)
+
+        vertex_inflections[i] = _count_reversals(z)
+
+        #integer millimetre positions of the samples at each spacing
+        x_mm = np.rint(x * 1000).astype(np.int64)
+        for j, spacing in enumerate(spacings):
+            step = int(round(spacing * 1000))
+            first = -(-x_mm[0] // step) * step
+            sampled_z = np.interp(np.arange(first, x_mm[-1] + 1, step) / 1000, x, z)
+            if reversals_only:
+                inflection_data[j, i] = _count_reversals(sampled_z)
+            else:
+                inflection_data[j, i] = np.count_nonzero(np.diff(np.sign(np.diff(sampled_z))) != 0)
+
+    results = summarize_roughness(sections, inflection_data)
+    results.update({'spacings': spacings, 'reversals_only': reversals_only,
+                    'vertex_inflections': vertex_inflections})
+    return results
+
+def analyze_roughness_filter_bank(sections, filters = FILTER_BANK, 
+                                  spacings = SPACINGS, dx = 0.1, 
+                                  precision = 'float64', reversals_only = True):
+    """Run analyze_roughness for every smoothing filter in filters.
+
+    Cross-sections are densified once and each filter is applied to all of 
+    them in one batched call. Returns a dict mapping each (method, width) 
+    pair to the results dict that analyze_roughness would return for it. 
+    Only slope reversals are counted for every filter, including 'none', so 
+    that counts are comparable across the bank (see count_inflections).
+    """
+    profiles = [densify_xs(df, dx, precision = precision) 
+                for df in flatten_sections(sections)]
+    zstack, lengths = stack_profiles(profiles)
+
+    bank = {}
+    for method, width in filters:
+        smoothed = smooth_stack(zstack, method, width, dx)
+        filtered = [(xnew, smoothed[i, :lengths[i]]) 
+                    for i, (xnew, znew) in enumerate(profiles)]
+        results = summarize_roughness(sections, count_inflections(filtered, spacings, precision,
+                                                                  reversals_only))
+        results.update({'spacings': spacings, 'dx': dx, 'precision': precision,
+                        'smoothing': (method, width), 'reversals_only': reversals_only})
+        bank[(method, width)] = results
+    return bank
+
+def permutation_test_roughness(results, n_permutations = 10000, seed = None, 
+                               chunk_size = 2000):
+    """Test whether inflection frequency curves differ among lithologies.
+
+    Section-to-lithology labels are shuffled across the columns of 
+    results['inflection_frequency'] (from analyze_roughness), all 
+    permutations in a chunk at once. At each sampling scale the statistic 
+    is the fraction of variance among sections explained by lithology 
+    (between-group over total sum of squares, which orders permutations 
+    identically to a one-way F statistic). The global p-value compares the 
+    largest statistic over all scales against its permutation distribution, 
+    and per-scale p-values are adjusted for multiple comparisons with the 
+    same max-statistic distribution.
+
+    Returns a dict holding the observed statistic at each scale 
+    ('statistic'), the unadjusted ('pvalues') and max-statistic adjusted 
+    ('adjusted_pvalues') per-scale p-values, and the global p-value 
+    ('global_pvalue').
+    """
+    rng = np.random.default_rng(seed)
+    freq = results['inflection_frequency']
+    names, labels = np.unique(results['lithologies'], return_inverse = True)
+    n_groups = len(names)
+    n_sections = freq.shape[1]
+
+    #center each scale so that the between-group sum of squares is 
+    #sum over groups of (group sum)^2 / group size
+    centered = freq - freq.mean(axis = 1, keepdims = True)
+    total_ss = np.sum(centered**2, axis = 1)
+    total_ss[total_ss == 0] = np.inf #no variance at this scale
+    group_sizes = np.bincount(labels, minlength = n_groups)
+
+    def explained_variance(onehot):
+        #onehot: n_perms x n_sections x n_groups
+        group_sums = np.einsum('sn,pnk->psk', centered, onehot)
+        return np.sum(group_sums**2 / group_sizes, axis = 2) / total_ss
+
+    observed = explained_variance(np.eye(n_groups)[labels][None])[0]
+    observed_max = observed.max()
+
+    exceed = np.zeros(len(observed))
+    exceed_adjusted = np.zeros(len(observed))
+    exceed_global = 0
+    for start in range(0, n_permutations, chunk_size):
+        n = min(chunk_size, n_permutations - start)
+        shuffled = rng.permuted(np.tile(labels, (n, 1)), axis = 1)
+        onehot = np.eye(n_groups)[shuffled]
+        perm_stats = explained_variance(onehot)
+        perm_max = perm_stats.max(axis = 1)
+        exceed += np.sum(perm_stats >= observed - 1e-12, axis = 0)
+        exceed_adjusted += np.sum(perm_max[:, None] >= observed - 1e-12, axis = 0)
+        exceed_global += np.sum(perm_max >= observed_max - 1e-12)
+
+    return {'statistic': observed, 
+            'pvalues': (exceed + 1) / (n_permutations + 1),
+            'adjusted_pvalues': (exceed_adjusted + 1) / (n_permutations + 1),
+            'global_pvalue': (exceed_global + 1) / (n_permutations + 1),
+            'n_permutations': n_permutations}
+
+def plot_roughness(results):
+    """Make Figure 12 from the output of analyze_roughness; return the figure."""
+    spacings = results['spacings']
+
+    fig, axs = plt.subplots(1, 1, figsize = (6, 4.5))
+
+    edgecolor = matplotlib.colors.ColorConverter().to_rgba('k', alpha=0.2)
+    markersize = 100
+
+    carb_facecolor = matplotlib.colors.ColorConverter().to_rgba('lightblue', 
+                                                                alpha = 0.2)
+    carb_zorder = 5
+
+
+    coarse_facecolor = matplotlib.colors.ColorConverter().to_rgba('moccasin', 
+                                                                  alpha = 0.2)
+    coarse_zorder = 4
+
+
+    fine_facecolor = matplotlib.colors.ColorConverter().to_rgba('moccasin', 
+                                                                alpha = 0.2)
+    fine_alpha = 0.5
+    fine_zorder = 3
+
+    averages = axs
+
+    averages.scatter(spacings, results['carb_averages'], s = 100, color = carb_facecolor, 
+                     marker = '^', alpha = 1., edgecolor = 'k', zorder = 3, 
+                     label = 'Carbonate', clip_on = False)
+    averages.scatter(spacings, results['coarse_averages'], s = 100, color = coarse_facecolor, 
+                     marker = 'o', alpha = 1., edgecolor = 'k', zorder = 3, 
+                     label = 'Coarse sandstone', clip_on = False)
+    averages.scatter(spacings, results['fine_averages'], s = 100, color = fine_facecolor, 
+                     marker = 's', alpha = 1., edgecolor = 'k', zorder = 3, 
+                     label = 'Fine sandstone', clip_on = False)
+
+    averages.text(-1.7, 0.23, 'rougher' '\n' 'boundary', style = 'italic')
+    averages.text(-1.7, 0.0, 'smoother' '\n' 'boundary', style = 'italic')
+
+
+    averages.set_xlabel('Sampling interval [m]', fontsize = 16)
+    averages.set_ylabel('Inflection frequency [m$^{-1}$]', fontsize = 16)
+
+    handles, labels = averages.get_legend_handles_labels()
+    averages.legend(handles[::-1], labels[::-1], loc='upper right', 
+                    edgecolor = 'k')
+
+    averages.set_xlim(0, 10)
+
+    averages.axvspan(0.2, 3, alpha = 0.5, color = 'gray')
+    averages.text(1, 0.02, 
+                  'typical' + '\n' 'surveyed' + '\n' + 'point' + '\n' + 'spacing')
+
+    plt.tight_layout()
+    return fig
+
+if __name__ == '__main__':
+    results = analyze_roughness(load_cross_sections())
+    fig = plot_roughness(results)
+    save_figure(fig, 'fig12_xs_roughness')
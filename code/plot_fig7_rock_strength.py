@@ -20,155 +20,203 @@ import numpy as np
 from scipy.stats import kruskal, mannwhitneyu
 import scikit_posthocs
 
-all_breaks = pd.read_csv('../data/rock_strength/strength_data.csv')
-all_breaks = all_breaks[all_breaks['Is50MPa'] != '#VALUE!']
-all_breaks['Is50MPa'] = all_breaks['Is50MPa'].astype(float)
+from figure_io import save_figure
+
+#lithology codes in each group, in the order the groups are plotted
+GROUPS = {'c1': ['C1'], 'c2': ['C2'], 'c3': ['C3'], 'c4': ['C4'],
+          'coarse': ['SS2'], 'fine': ['SS1']}
+LUMPED_GROUPS = {'carb': ['C1', 'C2', 'C3', 'C4'], 'sandstone': ['SS1', 'SS2']}
+
+#area of the point-load tester piston [m^2] used to convert gauge reading
+#LMPa [MPa] to load [MN]
+PISTON_AREA = 9.48e-4
+
+#default 1-sigma measurement errors for the Monte Carlo uncertainty analysis:
+#caliper width and height [cm], relative error in the equivalent core 
+#diameter De [-], and gauge reading LMPa [MPa]
+MC_SIGMAS = {'width': 0.1, 'height': 0.1, 'De': 0.05, 'LMPa': 0.1}
+
+def load_strength_data(path = '../data/rock_strength/strength_data.csv'):
+    """Read the point-load data, dropping breaks with no valid Is50MPa."""
+    all_breaks = pd.read_csv(path)
+    all_breaks = all_breaks[all_breaks['Is50MPa'] != '#VALUE!']
+    all_breaks['Is50MPa'] = all_breaks['Is50MPa'].astype(float)
+    return all_breaks
+
+def split_lithologies(all_breaks):
+    """Return a dict of group name -> DataFrame of breaks in that group."""
+    groups = {}
+    for name, liths in {**GROUPS, **LUMPED_GROUPS}.items():
+        groups[name] = all_breaks.loc[all_breaks['Lithology'].isin(liths)]
+    return groups
+
+def analyze_strength(all_breaks):
+    """Run the Figure 7 statistical tests.
+
+    Returns a dict holding the per-group DataFrames ('groups'), the
+    Kruskal-Wallis test among the six lithologies ('kw'), Dunn's post hoc
+    tests with separate ('dunns') and lumped ('dunns_lumped_carbs')
+    carbonates, and the carbonate versus sandstone Mann-Whitney U test ('mw').
+    """
+    groups = split_lithologies(all_breaks)
+    separate = [groups[name]['Is50MPa'] for name in GROUPS]
+    kw = kruskal(*separate)
+    dunns = scikit_posthocs.posthoc_dunn(separate, p_adjust = 'bonferroni')
+    dunns_lumped_carbs = scikit_posthocs.posthoc_dunn([groups['carb']['Is50MPa'], groups['coarse']['Is50MPa'], groups['fine']['Is50MPa']], p_adjust = 'bonferroni')
+    mw = mannwhitneyu(groups['carb']['Is50MPa'], groups['sandstone']['Is50MPa'])
+    return {'groups': groups, 'kw': kw, 'dunns': dunns,
+            'dunns_lumped_carbs': dunns_lumped_carbs, 'mw': mw}
+
+def compute_is50(width, height, LMPa, De_factor = 1.):
+    """Return size-corrected point load index Is50 [MPa] from raw measurements.
+
+    width and height [cm] are the specimen dimensions normal to loading and 
+    LMPa [MPa] is the gauge reading at failure. De_factor scales the 
+    equivalent core diameter De = sqrt(4 * width * height / pi). Inputs may 
+    be arrays of any (broadcastable) shape.
+    """
+    De2 = 4 * width * height / np.pi * 1e-4 * De_factor**2 #[m^2]
+    Is = LMPa * PISTON_AREA / De2
+    F = (np.sqrt(De2) * 1000 / 50)**0.45 #size correction factor
+    return F * Is
+
+def monte_carlo_strength(all_breaks, n_draws = 10000, sigmas = MC_SIGMAS, 
+                         chunk_size = 5000, alpha = 0.05, seed = None):
+    """Propagate measurement error through the Is -> Is50 size correction.
+
+    Draws n_draws perturbed realizations of width, height, De, and LMPa for 
+    every break (normal errors with standard deviations from sigmas; see 
+    MC_SIGMAS) and recomputes Is50, the median of each group, and the 
+    Kruskal-Wallis and carbonate versus sandstone Mann-Whitney U tests for 
+    each realization. Draws are processed chunk_size at a time, so memory is 
+    bounded by chunk_size x number of breaks. Specimen length does not enter 
+    the size correction and is not perturbed.
+
+    Returns a dict holding the median of each group in every draw 
+    ('medians'), the p-values of every draw ('kw_pvalues', 'mw_pvalues'), 
+    the fraction of draws significant at alpha ('kw_frac_significant', 
+    'mw_frac_significant'), and a DataFrame of the median and 95% interval 
+    of each group median ('summary').
+    """
+    rng = np.random.default_rng(seed)
+    width = all_breaks['width'].to_numpy(dtype = float)
+    height = all_breaks['height'].to_numpy(dtype = float)
+    LMPa = all_breaks['LMPa'].to_numpy(dtype = float)
+    n_breaks = len(all_breaks)
+
+    all_groups = {**GROUPS, **LUMPED_GROUPS}
+    masks = {name: all_breaks['Lithology'].isin(liths).to_numpy() 
+             for name, liths in all_groups.items()}
+
+    medians = {name: np.zeros(n_draws) for name in all_groups}
+    kw_pvalues = np.zeros(n_draws)
+    mw_pvalues = np.zeros(n_draws)
+
+    for start in range(0, n_draws, chunk_size):
+        stop = min(start + chunk_size, n_draws)
+        shape = (stop - start, n_breaks)
+        w = width + sigmas['width'] * rng.standard_normal(shape)
+        h = height + sigmas['height'] * rng.standard_normal(shape)
+        De_factor = 1 + sigmas['De'] * rng.standard_normal(shape)
+        L = LMPa + sigmas['LMPa'] * rng.standard_normal(shape)
+        is50 = compute_is50(np.clip(w, 1e-3, None), np.clip(h, 1e-3, None), 
+                            np.clip(L, 0, None), np.clip(De_factor, 1e-3, None))
+
+        for name in all_groups:
+            medians[name][start:stop] = np.median(is50[:, masks[name]], axis = 1)
+        kw_pvalues[start:stop] = kruskal(*[is50[:, masks[name]] for name in GROUPS], 
+                                         axis = 1).pvalue
+        mw_pvalues[start:stop] = mannwhitneyu(is50[:, masks['carb']], 
+                                              is50[:, masks['sandstone']], 
+                                              axis = 1).pvalue
+
+    summary = pd.DataFrame({name: np.percentile(medians[name], [50, 2.5, 97.5]) 
+                            for name in all_groups}, 
+                           index = ['median', 'q2.5', 'q97.5']).T
+    return {'n_draws': n_draws, 'sigmas': sigmas, 'medians': medians,
+            'kw_pvalues': kw_pvalues, 'mw_pvalues': mw_pvalues,
+            'kw_frac_significant': np.mean(kw_pvalues < alpha),
+            'mw_frac_significant': np.mean(mw_pvalues < alpha),
+            'summary': summary}
 
-carb = all_breaks.loc[(all_breaks['Lithology'] == 'C1') | (all_breaks['Lithology'] == 'C2') | (all_breaks['Lithology'] == 'C3') | (all_breaks['Lithology'] == 'C4')]
-c1 = all_breaks.loc[(all_breaks['Lithology'] == 'C1')]
-c2 = all_breaks.loc[(all_breaks['Lithology'] == 'C2')]
-c3 = all_breaks.loc[(all_breaks['Lithology'] == 'C3')]
-c4 = all_breaks.loc[(all_breaks['Lithology'] == 'C4')]
-
-sandstone = all_breaks.loc[(all_breaks['Lithology'] == 'SS1') | (all_breaks['Lithology'] == 'SS2')]
-coarse =  all_breaks.loc[(all_breaks['Lithology'] == 'SS2')]
-fine = all_breaks.loc[(all_breaks['Lithology'] == 'SS1')]
+def adjacent_values(vals, q1, q3):
+    upper_adjacent_value = q3 + (q3 - q1) * 1.5
+    upper_adjacent_value = np.clip(upper_adjacent_value, q3, vals[-1])
 
-#make figure#################################################################
-hfont = {'fontname':'Arial'}
+    lower_adjacent_value = q1 - (q3 - q1) * 1.5
+    lower_adjacent_value = np.clip(lower_adjacent_value, vals[0], q1)
+    return lower_adjacent_value, upper_adjacent_value
 
-fig = plt.figure(figsize = (8, 4))
-widths = [7, 2]
-gs = fig.add_gridspec(ncols = 2, nrows = 1, width_ratios = widths)
-separate = fig.add_subplot(gs[0])
-combined = fig.add_subplot(gs[1])
+def plot_strength(results):
+    """Make Figure 7 from the output of analyze_strength; return the figure."""
+    groups = results['groups']
+    separate_names = list(GROUPS)
+    combined_names = list(LUMPED_GROUPS)
 
-separate.yaxis.grid(True, linestyle='-', which='major', color='lightgrey',
-               alpha=0.5)
+    hfont = {'fontname':'Arial'}
 
-color = dict(boxes='black', whiskers='black', medians='black', caps='black')
+    fig = plt.figure(figsize = (8, 4))
+    widths = [7, 2]
+    gs = fig.add_gridspec(ncols = 2, nrows = 1, width_ratios = widths)
+    separate = fig.add_subplot(gs[0])
+    combined = fig.add_subplot(gs[1])
 
-box = dict(linewidth = 2.0)
-whiskers = dict(linewidth = 2.0)
-median = dict(linewidth = 2.0, color = 'k')
-caps = dict(linewidth = 2.0)
-means = dict(marker = 'o', markeredgecolor = 'k', markerfacecolor = 'k')
+    separate.yaxis.grid(True, linestyle='-', which='major', color='lightgrey',
+                   alpha=0.5)
 
-separate_violin = separate.violinplot([c1['Is50MPa'], c2['Is50MPa'], c3['Is50MPa'], c4['Is50MPa'], coarse['Is50MPa'], fine['Is50MPa']], showextrema = False)
-combined_violin = combined.violinplot([carb['Is50MPa'], sandstone['Is50MPa']], showextrema = False)
+    separate_violin = separate.violinplot([groups[name]['Is50MPa'] for name in separate_names], showextrema = False)
+    combined_violin = combined.violinplot([groups[name]['Is50MPa'] for name in combined_names], showextrema = False)
 
-separate.set_ylim(0, 8)
-combined.set_ylim(0, 8)
+    separate.set_ylim(0, 8)
+    combined.set_ylim(0, 8)
 
-separate.set_ylabel('Point load index [MPa]', fontsize = 16, **hfont)
-separate.set_xticks([1, 2, 3, 4, 5, 6], ['C1', 'C2', 'C3', 'C4', 'Coarse', 'Fine'], **hfont)
-separate.set_yticks([0, 1, 2, 3, 4, 5, 6, 7, 8], ['0', '1', '2', '3', '4', '5', '6', '7', '8'], **hfont)
+    separate.set_ylabel('Point load index [MPa]', fontsize = 16, **hfont)
+    separate.set_xticks([1, 2, 3, 4, 5, 6], ['C1', 'C2', 'C3', 'C4', 'Coarse', 'Fine'], **hfont)
+    separate.set_yticks([0, 1, 2, 3, 4, 5, 6, 7, 8], ['0', '1', '2', '3', '4', '5', '6', '7', '8'], **hfont)
 
-separate.tick_params(axis='both', which='major', labelsize=12)
-combined.tick_params(axis='both', which='major', labelsize=12)
+    separate.tick_params(axis='both', which='major', labelsize=12)
+    combined.tick_params(axis='both', which='major', labelsize=12)
 
 
-combined.set_xticks([1,2], ['All carb', 'All SS'], **hfont)
-combined.yaxis.grid(True, linestyle='-', which='major', color='lightgrey',
-               alpha=0.5)
+    combined.set_xticks([1,2], ['All carb', 'All SS'], **hfont)
+    combined.yaxis.grid(True, linestyle='-', which='major', color='lightgrey',
+                   alpha=0.5)
 
-combined.yaxis.set_ticklabels([])
+    combined.yaxis.set_ticklabels([])
 
-iter = 0
-for pc in separate_violin['bodies']:
     colors = ['lightblue', 'lightblue', 'lightblue', 'lightblue', 'moccasin', 'moccasin']
-    pc.set_facecolor(colors[iter])
-    pc.set_edgecolor('black')
-    pc.set_linewidth = 2
-    pc.set_alpha(1)
-    iter += 1
-
-iter = 0
-for pc in combined_violin['bodies']:
-    colors = ['lightblue', 'moccasin']
-    pc.set_facecolor(colors[iter])
-    pc.set_edgecolor('black')
-    pc.set_linewidth = 2
-    pc.set_alpha(1)
-    iter += 1
-
-def adjacent_values(vals, q1, q3):
-    upper_adjacent_value = q3 + (q3 - q1) * 1.5
-    upper_adjacent_value = np.clip(upper_adjacent_value, q3, vals[-1])
+    for pc, color in zip(separate_violin['bodies'], colors):
+        pc.set_facecolor(color)
+        pc.set_edgecolor('black')
+        pc.set_linewidth = 2
+        pc.set_alpha(1)
 
-    lower_adjacent_value = q1 - (q3 - q1) * 1.5
-    lower_adjacent_value = np.clip(lower_adjacent_value, vals[0], q1)
-    return lower_adjacent_value, upper_adjacent_value
-
-
-quartile1, medians, quartile3 = np.percentile(c1['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(1, 1 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(c1['Is50MPa']), np.max(c1['Is50MPa']), color='k', linestyle='-', lw=1)
-
-
-quartile1, medians, quartile3 = np.percentile(c2['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(2, 2 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(c2['Is50MPa']), np.max(c2['Is50MPa']), color='k', linestyle='-', lw=1)
-
-quartile1, medians, quartile3 = np.percentile(c3['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(3, 3 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(c3['Is50MPa']), np.max(c3['Is50MPa']), color='k', linestyle='-', lw=1)
-
-quartile1, medians, quartile3 = np.percentile(c4['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(4, 4 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(c4['Is50MPa']), np.max(c4['Is50MPa']), color='k', linestyle='-', lw=1)
-
-quartile1, medians, quartile3 = np.percentile(coarse['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(5, 5 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(coarse['Is50MPa']), np.max(coarse['Is50MPa']), color='k', linestyle='-', lw=1)
-
-quartile1, medians, quartile3 = np.percentile(fine['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(6, 6 + 1)
-separate.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-separate.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-separate.vlines(inds, np.min(fine['Is50MPa']), np.max(fine['Is50MPa']), color='k', linestyle='-', lw=1)
-
-
-quartile1, medians, quartile3 = np.percentile(carb['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(1, 1 + 1)
-combined.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-combined.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-combined.vlines(inds, np.min(carb['Is50MPa']), np.max(carb['Is50MPa']), color='k', linestyle='-', lw=1)
-
-
-quartile1, medians, quartile3 = np.percentile(sandstone['Is50MPa'], [25, 50, 75], axis=0)
-inds = np.arange(2, 2 + 1)
-combined.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
-combined.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
-combined.vlines(inds, np.min(sandstone['Is50MPa']), np.max(sandstone['Is50MPa']), color='k', linestyle='-', lw=1)
-
-separate.text(0.75, 7.7, 'n = ' + str(len(c1)))
-separate.text(1.75, 7.7, 'n = ' + str(len(c2)))
-separate.text(2.75, 7.7, 'n = ' + str(len(c3)))
-separate.text(3.75, 7.7, 'n = ' + str(len(c4)))
-separate.text(4.75, 7.7, 'n = ' + str(len(coarse)))
-separate.text(5.75, 7.7, 'n = ' + str(len(fine)))
-
-combined.text(0.75, 7.7, 'n = ' + str(len(carb)))
-combined.text(1.75, 7.7, 'n = ' + str(len(sandstone)))
-
-plt.tight_layout()
-fig.savefig('../figures/fig7_rock_strength.png', dpi=1000, bbox_inches = "tight")
-fig.savefig('../figures/fig7_rock_strength.pdf', dpi=1000, bbox_inches = "tight")
-
-
-#statistical testing
-kw = kruskal(c1['Is50MPa'], c2['Is50MPa'], c3['Is50MPa'], c4['Is50MPa'], coarse['Is50MPa'], fine['Is50MPa'])
-dunns = scikit_posthocs.posthoc_dunn([c1['Is50MPa'], c2['Is50MPa'], c3['Is50MPa'], c4['Is50MPa'], coarse['Is50MPa'], fine['Is50MPa']], p_adjust = 'bonferroni')
-dunns_lumped_carbs = scikit_posthocs.posthoc_dunn([carb['Is50MPa'], coarse['Is50MPa'], fine['Is50MPa']], p_adjust = 'bonferroni')
-mw = mannwhitneyu(carb['Is50MPa'], sandstone['Is50MPa'])
\ No newline at end of file
+    colors = ['lightblue', 'moccasin']
+    for pc, color in zip(combined_violin['bodies'], colors):
+        pc.set_facecolor(color)
+        pc.set_edgecolor('black')
+        pc.set_linewidth = 2
+        pc.set_alpha(1)
+
+    #median, interquartile range, and full range of each group
+    for ax, names in [(separate, separate_names), (combined, combined_names)]:
+        for i, name in enumerate(names):
+            vals = groups[name]['Is50MPa']
+            quartile1, medians, quartile3 = np.percentile(vals, [25, 50, 75], axis=0)
+            inds = np.arange(i + 1, i + 2)
+            ax.scatter(inds, medians, marker='^', color='white', s=30, zorder=3)
+            ax.vlines(inds, quartile1, quartile3, color='k', linestyle='-', lw=5)
+            ax.vlines(inds, np.min(vals), np.max(vals), color='k', linestyle='-', lw=1)
+
+    for i, name in enumerate(separate_names):
+        separate.text(i + 0.75, 7.7, 'n = ' + str(len(groups[name])))
+    for i, name in enumerate(combined_names):
+        combined.text(i + 0.75, 7.7, 'n = ' + str(len(groups[name])))
+
+    plt.tight_layout()
+    return fig
+
+if __name__ == '__main__':
+    results = analyze_strength(load_strength_data())
+    fig = plot_strength(results)
+    save_figure(fig, 'fig7_rock_strength')
@@ -16,120 +16,143 @@ Please cite the code repository and/or paper if you use this code.
 
 import pandas as pd
 import matplotlib.pyplot as plt
-import numpy as np
 from scipy.stats import kruskal, mannwhitneyu
 import scikit_posthocs
 
-#import and analyze bed thickness data
-beds = pd.read_csv('../data/bed_and_fracture_spacing/bedding_thickness.csv', delimiter = ',', 
-                   encoding = 'UTF-8')
-beds = beds[:25] #cut out trailing NaNs
-
-#calculate averages
-beds_fine_mean = beds.mean(skipna = True).iloc[0]
-beds_coarse_mean = beds.mean(skipna = True).iloc[1]
-beds_carb_mean = beds.mean(skipna = True).iloc[2]
-
-#import and analyze fracture spacing data
-fractures = pd.read_csv('../data/bed_and_fracture_spacing/fracture_spacing.csv', delimiter = ',', 
-                        encoding = 'UTF-8')*100 #convert m to cm
-
-fractures_fine_mean = fractures.mean(skipna = True).iloc[0]
-fractures_coarse_mean = fractures.mean(skipna = True).iloc[1]
-
-#separate carbonate fractures into thalweg and bank set based on the indicator 
-# number in column 'Carb-transect.' 100 = thalweg; 200 = bank
-fractures_carb_thalweg = fractures[['Carb', 'Carb-transect']][fractures['Carb-transect'] == 100]
-fractures_carb_thalweg_mean = fractures_carb_thalweg.mean().iloc[0]
-
-fractures_carb_bank = fractures[['Carb', 'Carb-transect']][fractures['Carb-transect'] == 200]
-fractures_carb_bank_mean = fractures_carb_bank.mean().iloc[0]
-
-#make figure#################################################################
-fig, ax = plt.subplots(figsize = (6, 4.7))
-size = 300
-
-#plot bed thickness/fracture spacing data
-ax.scatter(beds_fine_mean, fractures_fine_mean, s = size, marker = 's', 
-           facecolor = 'moccasin', edgecolor = 'k', zorder = 2, 
-           label = 'Fine sandstone')
-ax.scatter(beds_coarse_mean, fractures_coarse_mean, s = size, marker = 'o', 
-           facecolor = 'moccasin', edgecolor = 'k', zorder = 2, 
-           label = 'Coarse sandstone')
-ax.scatter(beds_carb_mean, fractures_carb_thalweg_mean, s = size, marker = '^', 
-           facecolor = 'lightblue', edgecolor = 'k', zorder = 2, 
-           label = 'Carbonate T (thalweg)')
-ax.scatter(beds_carb_mean, fractures_carb_bank_mean, s = size, marker = '^', 
-           facecolor = 'lightblue', edgecolor = 'k', zorder = 4, 
-           label = 'Carbonate B (bank)')
-
-#plot bed thickness/fracture spacing error bars
-beds_fine_stdev = beds.std().iloc[0]
-fractures_fine_stdev = fractures.std().iloc[0]
-ax.errorbar(beds_fine_mean, fractures_fine_mean, xerr = beds_fine_stdev, 
-            yerr = fractures_fine_stdev, color = 'k', zorder = 1, capsize = 4)
-
-beds_coarse_stdev = beds.std().iloc[1]
-fractures_coarse_stdev = fractures.std().iloc[1]
-ax.errorbar(beds_coarse_mean, fractures_coarse_mean, xerr = beds_coarse_stdev, 
-            yerr = fractures_coarse_stdev, color = 'k', zorder = 1, 
-            capsize = 4)
-
-beds_carb_stdev = beds.std().iloc[2]
-fractures_thalweg_stdev = fractures_carb_thalweg.std().iloc[0]
-fractures_bank_stdev = fractures_carb_bank.std().iloc[0]
-
-eb1 = ax.errorbar(beds_carb_mean, fractures_carb_thalweg_mean, 
-                  xerr = beds_carb_stdev, yerr = fractures_thalweg_stdev, 
-                  color = 'k', zorder = 1, capsize = 4)
-eb2 = ax.errorbar(beds_carb_mean, fractures_carb_bank_mean, 
-                  xerr = beds_carb_stdev, yerr = fractures_bank_stdev, 
-                  color = 'k', zorder = 3, capsize = 4, ecolor = 'gray')
-eb2[-1][0].set_linestyle(':')
-eb2[-1][1].set_linestyle(':')
-
-ax.set_xlabel('Bed thickness [cm]', fontsize = 16)
-ax.set_ylabel('Fracture spacing [cm]', fontsize = 16)
-
-ax.set_xlim(-5, 100)
-ax.set_ylim(-10, 500)
-ax.legend(loc = 'lower right', labelspacing = 1, edgecolor = 'k', 
-          borderpad = 1)
-
-ax.text(39.5, 148, 'T', fontsize = 14)
-ax.text(39.5, 285, 'B', fontsize = 14)
-
-plt.tight_layout()
-fig.savefig('../figures/fig8_beds_fractures.png', dpi=1000, bbox_inches = 'tight')
-fig.savefig('../figures/fig8_beds_fractures.pdf', dpi=1000, bbox_inches = 'tight')
-
-
-#statistical testing: bed thickness
-beds_fine = beds['Fine'][0:17]
-beds_coarse = beds['Coarse'][0:18]
-beds_carb = beds['Carb']
-beds_all_ss = pd.concat([beds['Fine'][0:17], beds['Coarse'][0:18]])
-kw_beds = kruskal(beds_fine, beds_coarse, beds_carb)
-dunns_beds = scikit_posthocs.posthoc_dunn([beds_fine, beds_coarse, beds_carb], 
-                                          p_adjust = 'bonferroni')
-mwu_beds = mannwhitneyu(beds_all_ss, beds_carb)
-
-#statistical testing: fracture spacing
-fractures_carb_thalweg_stats = fractures_carb_thalweg['Carb']
-fractures_carb_bank_stats = fractures_carb_bank['Carb']
-fractures_fine_stats = fractures['Fine']
-fractures_coarse_stats = fractures['Coarse'][0:26]
-fracs_all_ss = pd.concat([fractures_fine_stats, fractures_coarse_stats])
-fracs_all_carb = pd.concat([fractures_carb_thalweg_stats, 
-                            fractures_carb_bank_stats])
-kw_fracs = kruskal(fractures_fine_stats, fractures_coarse_stats, 
-                   fractures_carb_thalweg_stats, fractures_carb_bank_stats)
-dunns_fracs = scikit_posthocs.posthoc_dunn([fractures_fine_stats, 
-                                            fractures_coarse_stats, 
-                                            fractures_carb_thalweg_stats, 
-                                            fractures_carb_bank_stats], 
-                                           p_adjust = 'bonferroni')
-kw_fracs_combined_carbs = kruskal(fractures_fine_stats, fractures_coarse_stats, fracs_all_carb)
-dunns_fracs_combined_carbs = scikit_posthocs.posthoc_dunn([fractures_fine_stats, fractures_coarse_stats, fracs_all_carb], p_adjust = 'bonferroni')
-mwu_fracs = mannwhitneyu(fracs_all_ss, fracs_all_carb)
-
+from figure_io import save_figure
+
+def load_beds(path = '../data/bed_and_fracture_spacing/bedding_thickness.csv'):
+    """Read the bed thickness data [cm]."""
+    beds = pd.read_csv(path, delimiter = ',', encoding = 'UTF-8')
+    beds = beds.dropna(how = 'all') #cut out trailing NaNs
+    return beds
+
+def load_fractures(path = '../data/bed_and_fracture_spacing/fracture_spacing.csv'):
+    """Read the fracture spacing data and convert it from m to cm."""
+    fractures = pd.read_csv(path, delimiter = ',', 
+                            encoding = 'UTF-8')*100 #convert m to cm
+    return fractures
+
+def analyze_beds_fractures(beds, fractures):
+    """Summarize bed thickness and fracture spacing and run the Figure 8 tests.
+
+    Returns a dict holding the group means and standard deviations plotted in
+    Figure 8 (e.g. 'beds_fine_mean', 'fractures_bank_stdev') along with the
+    Kruskal-Wallis, Dunn's, and Mann-Whitney U tests for bed thickness
+    ('kw_beds', 'dunns_beds', 'mwu_beds') and fracture spacing ('kw_fracs',
+    'dunns_fracs', 'kw_fracs_combined_carbs', 'dunns_fracs_combined_carbs',
+    'mwu_fracs').
+    """
+    results = {}
+
+    #calculate averages
+    results['beds_fine_mean'] = beds.mean(skipna = True).iloc[0]
+    results['beds_coarse_mean'] = beds.mean(skipna = True).iloc[1]
+    results['beds_carb_mean'] = beds.mean(skipna = True).iloc[2]
+
+    results['fractures_fine_mean'] = fractures.mean(skipna = True).iloc[0]
+    results['fractures_coarse_mean'] = fractures.mean(skipna = True).iloc[1]
+
+    #separate carbonate fractures into thalweg and bank set based on the indicator 
+    # number in column 'Carb-transect.' 100 = thalweg; 200 = bank
+    fractures_carb_thalweg = fractures[['Carb', 'Carb-transect']][fractures['Carb-transect'] == 100]
+    results['fractures_carb_thalweg_mean'] = fractures_carb_thalweg.mean().iloc[0]
+
+    fractures_carb_bank = fractures[['Carb', 'Carb-transect']][fractures['Carb-transect'] == 200]
+    results['fractures_carb_bank_mean'] = fractures_carb_bank.mean().iloc[0]
+
+    #bed thickness/fracture spacing standard deviations
+    results['beds_fine_stdev'] = beds.std().iloc[0]
+    results['fractures_fine_stdev'] = fractures.std().iloc[0]
+    results['beds_coarse_stdev'] = beds.std().iloc[1]
+    results['fractures_coarse_stdev'] = fractures.std().iloc[1]
+    results['beds_carb_stdev'] = beds.std().iloc[2]
+    results['fractures_thalweg_stdev'] = fractures_carb_thalweg.std().iloc[0]
+    results['fractures_bank_stdev'] = fractures_carb_bank.std().iloc[0]
+
+    #statistical testing: bed thickness
+    beds_fine = beds['Fine'].dropna()
+    beds_coarse = beds['Coarse'].dropna()
+    beds_carb = beds['Carb'].dropna()
+    beds_all_ss = pd.concat([beds_fine, beds_coarse])
+    results['kw_beds'] = kruskal(beds_fine, beds_coarse, beds_carb)
+    results['dunns_beds'] = scikit_posthocs.posthoc_dunn([beds_fine, beds_coarse, beds_carb], 
+                                                         p_adjust = 'bonferroni')
+    results['mwu_beds'] = mannwhitneyu(beds_all_ss, beds_carb)
+
+    #statistical testing: fracture spacing
+    fractures_carb_thalweg_stats = fractures_carb_thalweg['Carb']
+    fractures_carb_bank_stats = fractures_carb_bank['Carb']
+    fractures_fine_stats = fractures['Fine'].dropna()
+    fractures_coarse_stats = fractures['Coarse'].dropna()
+    fracs_all_ss = pd.concat([fractures_fine_stats, fractures_coarse_stats])
+    fracs_all_carb = pd.concat([fractures_carb_thalweg_stats, 
+                                fractures_carb_bank_stats])
+    results['kw_fracs'] = kruskal(fractures_fine_stats, fractures_coarse_stats, 
+                                  fractures_carb_thalweg_stats, fractures_carb_bank_stats)
+    results['dunns_fracs'] = scikit_posthocs.posthoc_dunn([fractures_fine_stats, 
+                                                           fractures_coarse_stats, 
+                                                           fractures_carb_thalweg_stats, 
+                                                           fractures_carb_bank_stats], 
+                                                          p_adjust = 'bonferroni')
+    results['kw_fracs_combined_carbs'] = kruskal(fractures_fine_stats, fractures_coarse_stats, fracs_all_carb)
+    results['dunns_fracs_combined_carbs'] = scikit_posthocs.posthoc_dunn([fractures_fine_stats, fractures_coarse_stats, fracs_all_carb], p_adjust = 'bonferroni')
+    results['mwu_fracs'] = mannwhitneyu(fracs_all_ss, fracs_all_carb)
+    return results
+
+def plot_beds_fractures(results):
+    """Make Figure 8 from the output of analyze_beds_fractures; return the figure."""
+    r = results
+
+    fig, ax = plt.subplots(figsize = (6, 4.7))
+    size = 300
+
+    #plot bed thickness/fracture spacing data
+    ax.scatter(r['beds_fine_mean'], r['fractures_fine_mean'], s = size, marker = 's', 
+               facecolor = 'moccasin', edgecolor = 'k', zorder = 2, 
+               label = 'Fine sandstone')
+    ax.scatter(r['beds_coarse_mean'], r['fractures_coarse_mean'], s = size, marker = 'o', 
+               facecolor = 'moccasin', edgecolor = 'k', zorder = 2, 
+               label = 'Coarse sandstone')
+    ax.scatter(r['beds_carb_mean'], r['fractures_carb_thalweg_mean'], s = size, marker = '^', 
+               facecolor = 'lightblue', edgecolor = 'k', zorder = 2, 
+               label = 'Carbonate T (thalweg)')
+    ax.scatter(r['beds_carb_mean'], r['fractures_carb_bank_mean'], s = size, marker = '^', 
+               facecolor = 'lightblue', edgecolor = 'k', zorder = 4, 
+               label = 'Carbonate B (bank)')
+
+    #plot bed thickness/fracture spacing error bars
+    ax.errorbar(r['beds_fine_mean'], r['fractures_fine_mean'], xerr = r['beds_fine_stdev'], 
+                yerr = r['fractures_fine_stdev'], color = 'k', zorder = 1, capsize = 4)
+
+    ax.errorbar(r['beds_coarse_mean'], r['fractures_coarse_mean'], xerr = r['beds_coarse_stdev'], 
+                yerr = r['fractures_coarse_stdev'], color = 'k', zorder = 1, 
+                capsize = 4)
+
+    eb1 = ax.errorbar(r['beds_carb_mean'], r['fractures_carb_thalweg_mean'], 
+                      xerr = r['beds_carb_stdev'], yerr = r['fractures_thalweg_stdev'], 
+                      color = 'k', zorder = 1, capsize = 4)
+    eb2 = ax.errorbar(r['beds_carb_mean'], r['fractures_carb_bank_mean'], 
+                      xerr = r['beds_carb_stdev'], yerr = r['fractures_bank_stdev'], 
+                      color = 'k', zorder = 3, capsize = 4, ecolor = 'gray')
+    eb2[-1][0].set_linestyle(':')
+    eb2[-1][1].set_linestyle(':')
+
+    ax.set_xlabel('Bed thickness [cm]', fontsize = 16)
+    ax.set_ylabel('Fracture spacing [cm]', fontsize = 16)
+
+    ax.set_xlim(-5, 100)
+    ax.set_ylim(-10, 500)
+    ax.legend(loc = 'lower right', labelspacing = 1, edgecolor = 'k', 
+              borderpad = 1)
+
+    ax.text(39.5, 148, 'T', fontsize = 14)
+    ax.text(39.5, 285, 'B', fontsize = 14)
+
+    plt.tight_layout()
+    return fig
+
+if __name__ == '__main__':
+    results = analyze_beds_fractures(load_beds(), load_fractures())
+    fig = plot_beds_fractures(results)
+    save_figure(fig, 'fig8_beds_fractures')
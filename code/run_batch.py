@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script to run the Figure 7-12 analyses of the following paper for many
+field sites in one invocation:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Each site directory holds a data folder with the same layout as this
+repository's (rock_strength, bed_and_fracture_spacing, fracture_orientation,
+and cross_section_form, with any number of cross-sections per lithology).
+Sites are processed in parallel by one pool of worker processes that is kept
+for the whole batch. Figures are written to each site's figures folder along
+with a one-row site_summary.csv, and the summaries of all sites are combined
+into one table:
+
+    python run_batch.py site1 site2 site3 --summary all_sites.csv
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from cross_sections import load_cross_sections
+from figure_io import save_figure
+from metrics_catalog import open_catalog, write_metrics
+from plot_fig7_rock_strength import (load_strength_data, analyze_strength,
+                                     plot_strength, GROUPS, LUMPED_GROUPS)
+from plot_fig8_bed_thickness_fracture_spacing import (load_beds, load_fractures,
+                                                      analyze_beds_fractures,
+                                                      plot_beds_fractures)
+from plot_fig9_frac_orientation import (load_orientations, analyze_orientations,
+                                        plot_orientations, ASSEMBLAGES)
+from plot_fig10_all_cross_sections import plot_cross_sections
+from plot_fig11_hypsometry import analyze_hypsometry, plot_hypsometry
+from plot_fig12_roughness import analyze_roughness, plot_roughness
+
+def site_paths(site, data_dir = 'data', out_dir = 'figures'):
+    """Return the input files and output folder of a site directory."""
+    data = os.path.join(site, data_dir)
+    return {'strength': os.path.join(data, 'rock_strength', 'strength_data.csv'),
+            'beds': os.path.join(data, 'bed_and_fracture_spacing', 'bedding_thickness.csv'),
+            'fractures': os.path.join(data, 'bed_and_fracture_spacing', 'fracture_spacing.csv'),
+            'orientations': os.path.join(data, 'fracture_orientation', 'fracture_orientations.csv'),
+            'cross_sections': os.path.join(data, 'cross_section_form', ''),
+            'catalog': os.path.join(data, 'metrics_catalog.sqlite'),
+            'out_dir': os.path.join(site, out_dir)}
+
+def summarize_site(strength, beds_fractures, orientations, hypsometry, roughness):
+    """Collect the headline numbers of one site's analyses into a dict."""
+    summary = {}
+    for name in {**GROUPS, **LUMPED_GROUPS}:
+        summary['is50_median_' + name] = strength['groups'][name]['Is50MPa'].median()
+    summary['is50_kw_p'] = strength['kw'].pvalue
+    summary['is50_mw_p'] = strength['mw'].pvalue
+
+    for key in ['beds_fine_mean', 'beds_coarse_mean', 'beds_carb_mean',
+                'fractures_fine_mean', 'fractures_coarse_mean',
+                'fractures_carb_thalweg_mean', 'fractures_carb_bank_mean']:
+        summary[key] = beds_fractures[key]
+    summary['beds_kw_p'] = beds_fractures['kw_beds'].pvalue
+    summary['fractures_kw_p'] = beds_fractures['kw_fracs'].pvalue
+
+    #bearings are binned in both directions, so each fracture is counted twice
+    for name in ASSEMBLAGES:
+        counts = orientations[name + '_counts']
+        summary[name + '_n_fractures'] = int(counts.sum()) // 2
+        summary[name + '_modal_bearing'] = counts.idxmax().mid % 180
+
+    for lith in ['carb', 'coarse', 'fine']:
+        summary['n_sections_' + lith] = int(np.sum(roughness['lithologies'] == lith))
+        summary['elevation_median_' + lith] = np.median(hypsometry['save_' + lith + '_elevs_uniform_banks'])
+        summary['inflection_frequency_' + lith] = np.mean(roughness[lith + '_averages'])
+    summary['elevation_kw_p'] = hypsometry['kw'].pvalue
+    summary['elevation_mwu_p'] = hypsometry['mwu'].pvalue
+    return summary
+
+def analyze_site(site, data_dir = 'data', out_dir = 'figures', figures = True,
+                 formats = ('png', 'pdf'), dpi = 1000, catalog = False,
+                 tiled = False, bank_overrides = None):
+    """Run the Figure 7-12 analyses for one site; return its summary dict.
+
+    bank_overrides maps XS_ID to the left bank index used to trim that 
+    section's elevations (see plot_fig11_hypsometry.analyze_hypsometry); 
+    by default no section is overridden.
+
+    Figures (if figures is True) and site_summary.csv are written to the
+    site's out_dir, and per-section metrics to its metrics catalog if
+    catalog is True. If tiled is True, PNGs are rendered in tiles (see
+    figure_io.save_png_tiled).
+    """
+    if bank_overrides is None:
+        bank_overrides = {}
+    paths = site_paths(site, data_dir, out_dir)
+    os.makedirs(paths['out_dir'], exist_ok = True)
+    sections = load_cross_sections(paths['cross_sections'])
+
+    strength = analyze_strength(load_strength_data(paths['strength']))
+    beds_fractures = analyze_beds_fractures(load_beds(paths['beds']),
+                                            load_fractures(paths['fractures']))
+    orientations = analyze_orientations(load_orientations(paths['orientations']))
+    hypsometry = analyze_hypsometry(sections, bank_overrides = bank_overrides)
+    roughness = analyze_roughness(sections)
+
+    if figures:
+        for fig, name in [(plot_strength(strength), 'fig7_rock_strength'),
+                          (plot_beds_fractures(beds_fractures), 'fig8_beds_fractures'),
+                          (plot_orientations(orientations), 'fig9_fracture_orientation'),
+                          (plot_cross_sections(sections), 'fig10_all_XSs'),
+                          (plot_hypsometry(hypsometry), 'fig11_xs_hypsometry'),
+                          (plot_roughness(roughness), 'fig12_xs_roughness')]:
+            save_figure(fig, name, paths['out_dir'], formats, dpi, tiled)
+            plt.close(fig)
+    if catalog:
+        conn = open_catalog(paths['catalog'])
+        write_metrics(conn, sections, bank_overrides = bank_overrides, prune = True)
+        conn.close()
+
+    summary = {'site': os.path.basename(os.path.normpath(site))}
+    summary.update(summarize_site(strength, beds_fractures, orientations,
+                                  hypsometry, roughness))
+    pd.DataFrame([summary]).to_csv(os.path.join(paths['out_dir'], 'site_summary.csv'),
+                                   index = False)
+    return summary
+
+def _init_worker():
+    #workers only write figures to file
+    matplotlib.use('Agg')
+
+def run_batch(sites, max_workers = None, pool = None, bank_overrides = None,
+              **options):
+    """Run analyze_site for every site; return the cross-site summary table.
+
+    Sites are spread over a pool of max_workers processes that is created
+    once for the batch; pass an existing ProcessPoolExecutor as pool to keep
+    its workers warm across batches. bank_overrides maps site name (the
+    site directory's base name) to that site's bank overrides; sites not in
+    it have none. options are passed to analyze_site.
+    The table has one row per site, indexed by site name; sites that fail
+    keep a row with the error message in the 'error' column.
+    """
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers, initializer = _init_worker)
+    try:
+        if bank_overrides is None:
+            bank_overrides = {}
+        futures = [pool.submit(analyze_site, site, bank_overrides = 
+                               bank_overrides.get(os.path.basename(os.path.normpath(site))),
+                               **options) for site in sites]
+        rows = []
+        for site, future in zip(sites, futures):
+            try:
+                row = future.result()
+                row['error'] = ''
+            except Exception as err:
+                row = {'site': os.path.basename(os.path.normpath(site)),
+                       'error': type(err).__name__ + ': ' + str(err)}
+            rows.append(row)
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return pd.DataFrame(rows).set_index('site')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Run the Figure 7-12 analyses for many sites.')
+    parser.add_argument('sites', nargs = '+', help = 'site directories, each holding a data folder')
+    parser.add_argument('--summary', default = 'site_summary.csv',
+                        help = 'write the cross-site summary table to this .csv file')
+    parser.add_argument('--workers', type = int, default = None)
+    parser.add_argument('--data-dir', default = 'data', help = 'data folder name within each site')
+    parser.add_argument('--out-dir', default = 'figures', help = 'output folder name within each site')
+    parser.add_argument('--formats', nargs = '+', default = ['png', 'pdf'])
+    parser.add_argument('--dpi', type = int, default = 1000)
+    parser.add_argument('--no-figures', action = 'store_true')
+    parser.add_argument('--bank-overrides',
+                        help = '.json file mapping site name to {XS_ID: left bank index}')
+    parser.add_argument('--tiled', action = 'store_true',
+                        help = 'render PNGs in tiles to bound memory at high dpi')
+    parser.add_argument('--catalog', action = 'store_true',
+                        help = 'also write per-section metrics to each site\'s metrics catalog')
+    args = parser.parse_args()
+
+    bank_overrides = None
+    if args.bank_overrides is not None:
+        with open(args.bank_overrides) as fh:
+            bank_overrides = json.load(fh)
+    table = run_batch(args.sites, args.workers, bank_overrides = bank_overrides,
+                      data_dir = args.data_dir,
+                      out_dir = args.out_dir, figures = not args.no_figures,
+                      formats = tuple(args.formats), dpi = args.dpi,
+                      catalog = args.catalog, tiled = args.tiled)
+    table.to_csv(args.summary)
+    print(table.to_string())
+    sys.exit(int((table['error'] != '').any()))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spatial index over the survey points and cross-sections of the channel
+cross-section surveys used in the following paper:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Each reach (survey Location) has its own local X/Y coordinate system, so the
+index is built separately for each reach. Within a reach, KD-trees over the
+survey points and the cross-section centers answer nearest-section and
+sections-within-radius queries in logarithmic time.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from cross_sections import load_cross_sections
+
+def build_spatial_index(sections):
+    """Build KD-trees over survey points and cross-section centers.
+
+    sections is the output of cross_sections.load_cross_sections. Returns a
+    dict mapping each Location to a dict holding the cross-section IDs
+    ('xs_ids'), their lithologies ('lithologies'), the mean X/Y of each
+    cross-section ('centers'), a KD-tree over all survey points
+    ('point_tree') with the index of the cross-section each point belongs to
+    ('point_xs'), a KD-tree over the centers ('center_tree'), and the
+    distance of each center along the reach ('along_reach').
+    """
+    frames = []
+    for lith in sections:
+        for df in sections[lith]:
+            frames.append(df[['Location', 'XS_ID', 'XS_Number', 'X', 'Y']].assign(Lithology = lith))
+    points = pd.concat(frames, ignore_index = True)
+
+    index = {}
+    for location, reach in points.groupby('Location', sort = False):
+        xs_ids, point_xs = np.unique(reach['XS_ID'].to_numpy(), return_inverse = True)
+        xy = reach[['X', 'Y']].to_numpy(dtype = float)
+
+        #center of each cross-section: mean of its survey points
+        counts = np.bincount(point_xs)
+        centers = np.column_stack((np.bincount(point_xs, weights = xy[:, 0]),
+                                   np.bincount(point_xs, weights = xy[:, 1]))) / counts[:, None]
+        first = np.unique(point_xs, return_index = True)[1]
+        lithologies = reach['Lithology'].to_numpy()[first]
+        xs_numbers = reach['XS_Number'].to_numpy()[first]
+
+        #reach axis: principal direction of the cross-section centers,
+        #oriented so that distance along the reach increases with XS_Number
+        origin = centers.mean(axis = 0)
+        if len(centers) > 1:
+            axis = np.linalg.svd(centers - origin, full_matrices = False)[2][0]
+        else:
+            axis = np.array([1., 0.])
+        along_reach = (centers - origin) @ axis
+        if len(centers) > 1 and np.corrcoef(along_reach, xs_numbers)[0, 1] < 0:
+            axis = -axis
+            along_reach = -along_reach
+
+        index[location] = {'xs_ids': xs_ids, 'lithologies': lithologies,
+                           'centers': centers, 'point_xs': point_xs,
+                           'point_tree': cKDTree(xy),
+                           'center_tree': cKDTree(centers),
+                           'reach_origin': origin, 'reach_axis': axis,
+                           'along_reach': along_reach}
+    return index
+
+def nearest_section(index, location, x, y, use_centers = False):
+    """Return the ID of the cross-section nearest to (x, y) and its distance.
+
+    Distance is to the nearest survey point of that cross-section, or to its
+    center if use_centers is True. x and y may be scalars or arrays of query
+    points.
+    """
+    reach = index[location]
+    xy = np.column_stack((np.ravel(x), np.ravel(y)))
+    if use_centers:
+        dist, nearest = reach['center_tree'].query(xy)
+        xs_ids = reach['xs_ids'][nearest]
+    else:
+        dist, nearest = reach['point_tree'].query(xy)
+        xs_ids = reach['xs_ids'][reach['point_xs'][nearest]]
+    if np.ndim(x) == 0:
+        return xs_ids[0], dist[0]
+    return xs_ids, dist
+
+def sections_within_radius(index, location, x, y, radius):
+    """Return IDs of cross-sections with a survey point within radius of (x, y).
+
+    IDs are returned in order along the reach.
+    """
+    reach = index[location]
+    points = reach['point_tree'].query_ball_point([x, y], radius)
+    found = np.unique(reach['point_xs'][np.asarray(points, dtype = int)])
+    found = found[np.argsort(reach['along_reach'][found])]
+    return list(reach['xs_ids'][found])
+
+def order_along_reach(index, location):
+    """Return cross-section IDs and their distances [m] along the reach.
+
+    Distances are measured from the mean position of the cross-section
+    centers, so the first cross-section has a negative distance.
+    """
+    reach = index[location]
+    order = np.argsort(reach['along_reach'])
+    return list(reach['xs_ids'][order]), reach['along_reach'][order]
+
+def distance_along_reach(index, location, x, y):
+    """Project point(s) (x, y) onto the reach axis; return distance(s) [m]."""
+    reach = index[location]
+    xy = np.column_stack((np.ravel(x), np.ravel(y)))
+    along = (xy - reach['reach_origin']) @ reach['reach_axis']
+    if np.ndim(x) == 0:
+        return along[0]
+    return along
+
+if __name__ == '__main__':
+    index = build_spatial_index(load_cross_sections())
+    for location in index:
+        xs_ids, along = order_along_reach(index, location)
+        print(location)
+        for xs_id, dist in zip(xs_ids, along):
+            print('    ' + xs_id + ': ' + str(np.round(dist, 1)) + ' m')
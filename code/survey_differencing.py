@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions to difference repeat surveys of the channel cross-sections used in
+the following paper, for monitoring erosion between survey epochs:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+Surveys of the same XS_ID from different epochs are resampled onto one
+Position grid per cross-section (the stretch surveyed in every epoch, at dx
+spacing) and differenced between consecutive epochs. Z is differenced by
+default, since Normalized_Z is measured from each survey's own thalweg.
+Positive changes are aggradation and negative changes are erosion.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cross_sections import load_cross_sections, LITHOLOGIES
+
+def stack_epochs(epochs):
+    """Combine cross-sections from several survey epochs into one DataFrame.
+
+    epochs is a dict mapping epoch label to the output of
+    cross_sections.load_cross_sections for that epoch. Returns all survey
+    points with 'Epoch' and 'Lithology' columns added.
+    """
+    frames = []
+    for epoch, sections in epochs.items():
+        for lith in sections:
+            for df in sections[lith]:
+                frames.append(df.assign(Epoch = epoch, Lithology = lith))
+    return pd.concat(frames, ignore_index = True)
+
+def load_epochs(paths, lithologies = LITHOLOGIES):
+    """Read the cross-section surveys of several epochs; see stack_epochs.
+
+    paths is a dict mapping epoch label to a cross_section_form folder.
+    """
+    return stack_epochs({epoch: load_cross_sections(path, lithologies)
+                         for epoch, path in paths.items()})
+
+def _trapezoid(values, n_grid, dx):
+    #integral [m^2] along the last axis of values sampled dx apart, ignoring
+    #samples beyond n_grid (NaN)
+    first = values[..., 0]
+    last = np.take_along_axis(values, np.maximum(n_grid - 1, 0)[:, None, None], axis = -1)[..., 0]
+    return dx * (np.nansum(values, axis = -1) - 0.5 * (first + last))
+
+def _inflection_frequency(z, n_grid, dx, spacing):
+    #inflection points per metre of z resampled every spacing [m], counted
+    #as in plot_fig12_roughness.count_inflections
+    step = max(int(round(spacing / dx)), 1)
+    sampled = z[..., ::step]
+    n_sampled = (n_grid - 1) // step + 1
+    slope_sign = np.sign(np.diff(sampled, axis = -1))
+    changes = np.diff(slope_sign, axis = -1) != 0
+    #an inflection needs three samples inside the grid
+    inside = np.arange(changes.shape[-1])[None, :] < (n_sampled - 2)[:, None]
+    counts = np.sum(changes & inside[:, None, :], axis = -1).astype(float)
+    counts[np.isnan(z[..., 0])] = np.nan
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return counts / ((n_grid - 1) * dx)[:, None]
+
+def _resample(x, z, profile, lo, hi, positions):
+    #linearly interpolate every profile onto its grid positions at once. The
+    #profiles are laid end to end, stride metres apart, so that one sorted
+    #search finds the surveyed segment around every grid point; values are
+    #interpolated within segments in each profile's own Positions
+    stride = np.nanmax(hi) - np.nanmin(lo) + 1.
+    order = np.lexsort((x, profile))
+    x, z = x[order], z[order]
+    offsets = np.arange(lo.size).reshape(lo.shape) * stride
+    query = np.clip(positions, lo, hi)
+    missing = np.isnan(query)
+    query = np.nan_to_num(query)
+    left = np.searchsorted(x + profile[order] * stride, query + offsets, 
+                           side = 'right') - 1
+    left = np.clip(left, 0, len(x) - 2)
+    x0, x1, z0, z1 = x[left], x[left + 1], z[left], z[left + 1]
+    del left
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        weight = np.where(x1 > x0, (query - x0) / (x1 - x0), 0.)
+    zgrid = z0 + np.clip(weight, 0, 1) * (z1 - z0)
+    zgrid[missing] = np.nan
+    return zgrid
+
+def difference_surveys(surveys, dx = 0.1, elevation = 'Z', spacing = 1.):
+    """Resample every epoch of every cross-section onto a common grid and
+    difference consecutive epochs.
+
+    surveys is a DataFrame of survey points with 'XS_ID', 'Epoch',
+    'Position', and elevation columns (e.g. from stack_epochs). Epochs are
+    ordered by sorting their labels. Each cross-section's grid runs at dx
+    spacing over the Positions surveyed in every epoch it appears in; all
+    profiles are linearly interpolated onto their grids in one pass.
+    Roughness is the inflection frequency [1/m] of the resampled profile
+    sampled every spacing [m] (see plot_fig12_roughness).
+
+    Returns a dict holding the cross-section IDs ('xs_ids'), the epochs
+    ('epochs'), the grid of each cross-section ('positions', n_xs x n_grid),
+    the resampled elevations ('z', n_xs x n_epochs x n_grid), the change
+    profiles from each epoch to the next ('dz', n_xs x n_epochs - 1 x
+    n_grid), and a 'summary' DataFrame with one row per cross-section and
+    epoch pair: the mean, largest erosion, and largest aggradation of dz
+    [m], the net, eroded, and aggraded areas [m^2], and the inflection
+    frequency before, after, and its change. Grid points beyond a
+    cross-section's grid, and epochs in which it was not surveyed, are NaN.
+    """
+    xs_codes, xs_ids = pd.factorize(surveys['XS_ID'], sort = True)
+    epoch_codes, epochs = pd.factorize(surveys['Epoch'], sort = True)
+    n_xs, n_epochs = len(xs_ids), len(epochs)
+    profile = xs_codes * n_epochs + epoch_codes
+    x = surveys['Position'].to_numpy(dtype = float)
+    z = surveys[elevation].to_numpy(dtype = float)
+
+    #extent of each profile (NaN where a section was not surveyed in an epoch)
+    lo = np.full(n_xs * n_epochs, np.nan)
+    hi = np.full(n_xs * n_epochs, np.nan)
+    extent = pd.Series(x).groupby(profile).agg(['min', 'max'])
+    lo[extent.index] = extent['min']
+    hi[extent.index] = extent['max']
+    surveyed = ~np.isnan(lo).reshape(n_xs, n_epochs)
+
+    #common grid: the stretch of each section surveyed in all of its epochs
+    start = np.nanmax(lo.reshape(n_xs, n_epochs), axis = 1)
+    stop = np.nanmin(hi.reshape(n_xs, n_epochs), axis = 1)
+    n_grid = np.maximum(np.floor((stop - start) / dx + 1e-9).astype(int) + 1, 0)
+    columns = np.arange(n_grid.max())
+    positions = start[:, None] + dx * columns[None, :]
+    positions[columns[None, :] >= n_grid[:, None]] = np.nan
+
+    zgrid = _resample(x, z, profile, lo.reshape(n_xs, n_epochs, 1),
+                      hi.reshape(n_xs, n_epochs, 1), positions[:, None, :])
+
+    dz = zgrid[:, 1:, :] - zgrid[:, :-1, :]
+    roughness = _inflection_frequency(zgrid, n_grid, dx, spacing)
+
+    #all-NaN slices (unsurveyed epochs) give NaN without warning
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        metrics = {'mean_dz': np.nanmean(dz, axis = -1),
+                   'max_erosion': np.minimum(np.nanmin(dz, axis = -1), 0),
+                   'max_aggradation': np.maximum(np.nanmax(dz, axis = -1), 0),
+                   'area_change': _trapezoid(dz, n_grid, dx),
+                   'eroded_area': _trapezoid(np.fmax(-dz, 0), n_grid, dx),
+                   'aggraded_area': _trapezoid(np.fmax(dz, 0), n_grid, dx),
+                   'inflection_frequency_from': roughness[:, :-1],
+                   'inflection_frequency_to': roughness[:, 1:],
+                   'roughness_change': roughness[:, 1:] - roughness[:, :-1]}
+    summary = pd.DataFrame({'XS_ID': np.repeat(xs_ids, n_epochs - 1),
+                            'epoch_from': np.tile(epochs[:-1], n_xs),
+                            'epoch_to': np.tile(epochs[1:], n_xs),
+                            'grid_length': np.repeat((n_grid - 1) * dx, n_epochs - 1)})
+    for name, values in metrics.items():
+        summary[name] = values.ravel()
+    #pairs with an unsurveyed epoch have no change
+    paired = (surveyed[:, 1:] & surveyed[:, :-1]).ravel()
+    summary.loc[~paired, list(metrics)] = np.nan
+    if 'Lithology' in surveys.columns:
+        lithology = surveys.groupby('XS_ID')['Lithology'].first()
+        summary.insert(1, 'Lithology', lithology.loc[summary['XS_ID']].to_numpy())
+
+    return {'xs_ids': np.asarray(xs_ids), 'epochs': np.asarray(epochs),
+            'positions': positions, 'z': zgrid, 'dz': dz, 'dx': dx,
+            'summary': summary}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Difference repeat cross-section surveys.')
+    parser.add_argument('epochs', nargs = '+',
+                        help = 'cross_section_form folders, one per epoch, as label=folder (e.g. 2023=surveys/2023/); epochs are ordered by label')
+    parser.add_argument('--dx', type = float, default = 0.1)
+    parser.add_argument('--output', default = 'survey_changes.csv')
+    args = parser.parse_args()
+
+    paths = {}
+    for arg in args.epochs:
+        label, sep, path = arg.partition('=')
+        if sep == '':
+            label, path = arg, arg
+        paths[label] = path
+    results = difference_surveys(load_epochs(paths), dx = args.dx)
+    results['summary'].to_csv(args.output, index = False)
+    print(results['summary'].to_string(index = False))
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script to check the cross-section survey, rock strength, bed thickness,
+fracture spacing, and fracture orientation data used in the following paper
+before analysis:
+
+    Colaianne, N.J., Shobe, C.M., Moler, J., Benison, K.C., and Chilton, K.D.
+    (resubmitted September 2024) Beyond boundaries: Depositional environment
+    controls on erodibility, process, and form in rivers incising sedimentary
+    bedrock. Geosphere.
+
+All cross-section files are concatenated and checked together. Each problem
+found is one row of a report DataFrame with columns file, check, severity
+('error' or 'warning'), count (number of rows affected), and detail. Run as a
+script to write the report as .json or .csv; the exit status is 1 if any
+errors were found.
+
+Please cite the code repository and/or paper if you use this code.
+
+@author: Charles M. Shobe, U.S. Forest Service Rocky Mountain Research Station
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+
+import pandas as pd
+
+from cross_sections import LITHOLOGIES
+from plot_fig7_rock_strength import compute_is50, GROUPS, LUMPED_GROUPS
+from plot_fig9_frac_orientation import ASSEMBLAGES
+
+REPORT_COLUMNS = ['file', 'check', 'severity', 'count', 'detail']
+
+#columns every cross-section survey must have, and those that must be numeric
+XS_REQUIRED = ['Location', 'XS_Number', 'XS_ID', 'ORDER', 'X', 'Y', 'Z', 'CODE',
+               'Below_waterline', 'Normalized_Z', 'X_adj', 'Position']
+XS_NUMERIC = ['XS_Number', 'ORDER', 'X', 'Y', 'Z', 'Below_waterline',
+              'Normalized_Z', 'X_adj', 'Position']
+
+#columns the point-load strength data must have, and those that must be numeric
+STRENGTH_REQUIRED = ['Lithology', 'SampleID', 'length', 'width', 'height',
+                     'LMPa', 'IsMPa', 'Is50MPa']
+STRENGTH_NUMERIC = ['length', 'width', 'height', 'LMPa', 'IsMPa', 'Is50MPa']
+
+#columns of the bed thickness [cm], fracture spacing [m], and fracture
+#orientation files; blank cells pad the shorter columns of the first two
+BEDS_REQUIRED = ['Fine', 'Coarse', 'Carb']
+FRACTURES_REQUIRED = ['Fine', 'Coarse', 'Carb', 'Carb-transect']
+ORIENTATIONS_REQUIRED = ['AssemblageID', 'Bearing']
+
+#carbonate fracture transects as stored in fracture_spacing.csv (1 = thalweg,
+#2 = bank); load_fractures scales them with the spacings to 100 and 200
+CARB_TRANSECTS = [1, 2]
+
+#tolerance [m] for derived cross-section columns and relative tolerance for
+#the Is50 size correction
+XS_TOLERANCE = 1e-6
+IS50_TOLERANCE = 1e-4
+
+def _record(report, counts, check, severity, detail):
+    #add one report row per file with a nonzero count
+    counts = counts[counts > 0]
+    for fname, count in counts.items():
+        report.append({'file': fname, 'check': check, 'severity': severity,
+                       'count': int(count), 'detail': detail})
+
+def _coerce_numeric(df, columns, report, file_counts):
+    #convert columns to numbers, reporting values that are not numeric
+    for col in columns:
+        values = pd.to_numeric(df[col], errors = 'coerce')
+        bad = values.isna() & df[col].notna()
+        _record(report, file_counts(bad), 'dtype', 'error',
+                col + ' has non-numeric values')
+        df[col] = values
+    return df
+
+def _read_csv(fname, required, report, encoding = 'utf-8'):
+    #read a file as strings, checking that it parses, has data rows, and has
+    #the required columns; otherwise record an error and return None
+    try:
+        df = pd.read_csv(fname, dtype = str, encoding = encoding)
+    except (OSError, UnicodeDecodeError, pd.errors.EmptyDataError,
+            pd.errors.ParserError) as err:
+        report.append({'file': fname, 'check': 'read', 'severity': 'error',
+                       'count': 0, 'detail': type(err).__name__ + ': ' + str(err)})
+        return None
+    missing = [col for col in required if col not in df.columns]
+    if len(missing) > 0:
+        report.append({'file': fname, 'check': 'schema', 'severity': 'error',
+                       'count': 0, 'detail': 'missing columns ' + ', '.join(missing)})
+        return None
+    if len(df.dropna(how = 'all', subset = required)) == 0:
+        report.append({'file': fname, 'check': 'read', 'severity': 'error',
+                       'count': 0, 'detail': 'no data rows'})
+        return None
+    return df
+
+def validate_cross_sections(files):
+    """Check a list of cross-section survey files; return a report DataFrame."""
+    report = []
+    frames = []
+    for fname in files:
+        df = _read_csv(fname, XS_REQUIRED, report)
+        if df is None:
+            continue
+        frames.append(df[XS_REQUIRED].assign(file = fname))
+    if len(frames) == 0:
+        return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+    xs = pd.concat(frames, ignore_index = True)
+    def file_counts(mask):
+        return mask.groupby(xs['file'], sort = False).sum()
+
+    xs = _coerce_numeric(xs, XS_NUMERIC, report, file_counts)
+
+    #missing values
+    _record(report, file_counts(xs[XS_NUMERIC].isna().any(axis = 1)),
+            'nan', 'error', 'rows with missing numeric values')
+    _record(report, file_counts(xs['CODE'].isna()), 'nan', 'warning',
+            'CODE is blank')
+    blank_id = xs['XS_ID'].isna().groupby(xs['file'], sort = False).all()
+    _record(report, blank_id * xs.groupby('file', sort = False).size(),
+            'xs_id', 'warning', 'XS_ID is blank')
+
+    #station ordering
+    by_file = xs.groupby('file', sort = False)
+    _record(report, file_counts(by_file['Position'].diff() < 0), 'monotonic',
+            'warning', 'Position is not increasing; sections are re-sorted on load')
+    _record(report, file_counts(xs.duplicated(['file', 'Position'])),
+            'duplicate', 'warning', 'duplicate Position stations')
+
+    #surface codes
+    code = xs['CODE'].fillna('')
+    _record(report, file_counts(code != code.str.strip()), 'code', 'warning',
+            'CODE has leading or trailing whitespace')
+
+    #derived columns: Position runs from the minimum X_adj and Normalized_Z
+    #from the minimum (thalweg) Z
+    _record(report, file_counts(xs['Normalized_Z'] < 0), 'range', 'error',
+            'Normalized_Z below zero')
+    _record(report, file_counts(~xs['Below_waterline'].isin([0, 1])), 'range',
+            'error', 'Below_waterline is not 0 or 1')
+    position = xs['X_adj'] - by_file['X_adj'].transform('min')
+    _record(report, file_counts((position - xs['Position']).abs() > XS_TOLERANCE),
+            'consistency', 'error', 'Position does not equal X_adj - min(X_adj)')
+    normalized_z = xs['Z'] - by_file['Z'].transform('min')
+    _record(report, file_counts((normalized_z - xs['Normalized_Z']).abs() > XS_TOLERANCE),
+            'consistency', 'error', 'Normalized_Z does not equal Z - min(Z)')
+
+    return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+def validate_strength(fname):
+    """Check the point-load strength data file; return a report DataFrame."""
+    report = []
+    df = _read_csv(fname, STRENGTH_REQUIRED, report, encoding = 'utf-8-sig')
+    if df is None:
+        return pd.DataFrame(report, columns = REPORT_COLUMNS)
+    def file_counts(mask):
+        return pd.Series({fname: mask.sum()})
+
+    #spreadsheet errors are dropped on load, so they are warnings here
+    excel_error = df[STRENGTH_NUMERIC].apply(lambda col: col.str.startswith('#')).fillna(False)
+    _record(report, file_counts(excel_error.any(axis = 1)), 'spreadsheet_error',
+            'warning', 'rows with spreadsheet errors (e.g. #VALUE!); dropped on load')
+    df = df[~excel_error.any(axis = 1)].copy()
+
+    df = _coerce_numeric(df, STRENGTH_NUMERIC, report, file_counts)
+    _record(report, file_counts(df[STRENGTH_NUMERIC].isna().any(axis = 1)), 'nan',
+            'error', 'rows with missing values')
+
+    known = set(sum(GROUPS.values(), []) + sum(LUMPED_GROUPS.values(), []))
+    _record(report, file_counts(~df['Lithology'].isin(known)), 'lithology',
+            'warning', 'Lithology not in any analysis group')
+    _record(report, file_counts((df[['length', 'width', 'height', 'LMPa']] <= 0).any(axis = 1)),
+            'range', 'error', 'non-positive specimen dimension or load')
+
+    is50 = compute_is50(df['width'], df['height'], df['LMPa'])
+    mismatch = (is50 - df['Is50MPa']).abs() > IS50_TOLERANCE * df['Is50MPa'].abs()
+    _record(report, file_counts(mismatch), 'consistency', 'error',
+            'Is50MPa does not match width, height, and LMPa')
+    return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+def _read_table(fname, required, report):
+    #read a single-table file as _read_csv does, without its blank rows
+    df = _read_csv(fname, required, report, encoding = 'utf-8-sig')
+    if df is None:
+        return None
+    return df.dropna(how = 'all', subset = required).copy()
+
+def _padding_gaps(df, columns):
+    #blank cells above the last value of their column; the padding of shorter
+    #columns should only come at the end
+    return (df[columns].isna() & df[columns].notna()[::-1].cummax()[::-1]).any(axis = 1)
+
+def validate_beds(fname):
+    """Check the bed thickness data file; return a report DataFrame."""
+    report = []
+    df = _read_table(fname, BEDS_REQUIRED, report)
+    if df is None:
+        return pd.DataFrame(report, columns = REPORT_COLUMNS)
+    def file_counts(mask):
+        return pd.Series({fname: mask.sum()})
+
+    df = _coerce_numeric(df, BEDS_REQUIRED, report, file_counts)
+    _record(report, file_counts(_padding_gaps(df, BEDS_REQUIRED)), 'nan',
+            'warning', 'rows with blank cells above the end of their column')
+    _record(report, file_counts((df[BEDS_REQUIRED] <= 0).any(axis = 1)), 'range',
+            'error', 'non-positive bed thickness')
+    return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+def validate_fractures(fname):
+    """Check the fracture spacing data file; return a report DataFrame."""
+    report = []
+    df = _read_table(fname, FRACTURES_REQUIRED, report)
+    if df is None:
+        return pd.DataFrame(report, columns = REPORT_COLUMNS)
+    def file_counts(mask):
+        return pd.Series({fname: mask.sum()})
+
+    df = _coerce_numeric(df, FRACTURES_REQUIRED, report, file_counts)
+    spacings = ['Fine', 'Coarse', 'Carb']
+    _record(report, file_counts(_padding_gaps(df, spacings)), 'nan', 'warning',
+            'rows with blank cells above the end of their column')
+    #carbonate spacings are split by transect, so both must be given
+    _record(report, file_counts(df['Carb'].isna() != df['Carb-transect'].isna()),
+            'nan', 'error', 'Carb or Carb-transect is blank but not both')
+    _record(report, file_counts((df[spacings] <= 0).any(axis = 1)), 'range',
+            'error', 'non-positive fracture spacing')
+    transect = df['Carb-transect']
+    _record(report, file_counts(transect.notna() & ~transect.isin(CARB_TRANSECTS)),
+            'range', 'error', 'Carb-transect is not 1 (thalweg) or 2 (bank)')
+    return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+def validate_orientations(fname):
+    """Check the fracture orientation data file; return a report DataFrame."""
+    report = []
+    df = _read_table(fname, ORIENTATIONS_REQUIRED, report)
+    if df is None:
+        return pd.DataFrame(report, columns = REPORT_COLUMNS)
+    def file_counts(mask):
+        return pd.Series({fname: mask.sum()})
+
+    df = _coerce_numeric(df, ORIENTATIONS_REQUIRED, report, file_counts)
+    _record(report, file_counts(df[ORIENTATIONS_REQUIRED].isna().any(axis = 1)),
+            'nan', 'error', 'rows with missing values')
+    assemblage = df['AssemblageID']
+    _record(report, file_counts(assemblage.notna() & ~assemblage.isin(list(ASSEMBLAGES.values()))),
+            'range', 'error', 'AssemblageID is not one of ' 
+            + ', '.join(str(int(i)) for i in sorted(ASSEMBLAGES.values())))
+    bearing = df['Bearing']
+    _record(report, file_counts((bearing < 0) | (bearing > 360)), 'range', 'error',
+            'Bearing outside 0-360 degrees')
+    #rose diagram bins are closed on the right, (0, N] ... (360 - N, 360]
+    _record(report, file_counts(bearing == 0), 'range', 'warning',
+            'Bearing of 0 is not binned; record it as 360')
+    return pd.DataFrame(report, columns = REPORT_COLUMNS)
+
+def validate_data(data_dir = '../data/'):
+    """Check all cross-section surveys and the strength, bed thickness,
+    fracture spacing, and fracture orientation data under data_dir.
+
+    A missing cross_section_form folder, a lithology without surveys, or a 
+    missing data file is reported as an error.
+    """
+    report = []
+    xs_dir = os.path.join(data_dir, 'cross_section_form')
+    xs_files = sorted(glob.glob(os.path.join(xs_dir, '*.csv')))
+    if not os.path.isdir(xs_dir):
+        report.append({'file': xs_dir, 'check': 'missing', 'severity': 'error',
+                       'count': 0, 'detail': 'cross-section folder not found'})
+    else:
+        for lith, prefix in LITHOLOGIES.items():
+            if not any(re.fullmatch(re.escape(prefix) + r'_\d+\.csv', os.path.basename(fname))
+                       for fname in xs_files):
+                report.append({'file': os.path.join(xs_dir, prefix + '_<n>.csv'),
+                               'check': 'missing', 'severity': 'error', 'count': 0,
+                               'detail': 'no ' + lith + ' cross-section surveys'})
+    reports = [pd.DataFrame(report, columns = REPORT_COLUMNS), 
+               validate_cross_sections(xs_files)]
+    for validate, fname in [(validate_strength, os.path.join('rock_strength', 'strength_data.csv')),
+                            (validate_beds, os.path.join('bed_and_fracture_spacing', 'bedding_thickness.csv')),
+                            (validate_fractures, os.path.join('bed_and_fracture_spacing', 'fracture_spacing.csv')),
+                            (validate_orientations, os.path.join('fracture_orientation', 'fracture_orientations.csv'))]:
+        fname = os.path.join(data_dir, fname)
+        if os.path.exists(fname):
+            reports.append(validate(fname))
+        else:
+            reports.append(pd.DataFrame([{'file': fname, 'check': 'missing', 
+                                          'severity': 'error', 'count': 0,
+                                          'detail': 'file not found'}], 
+                                        columns = REPORT_COLUMNS))
+    return pd.concat(reports, ignore_index = True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Check input data files.')
+    parser.add_argument('data_dir', nargs = '?', default = '../data/')
+    parser.add_argument('--output', help = 'write the report to this .json or .csv file')
+    args = parser.parse_args()
+
+    report = validate_data(args.data_dir)
+    if args.output is None:
+        print(report.to_string(index = False))
+    elif args.output.endswith('.json'):
+        report.to_json(args.output, orient = 'records', indent = 1)
+    else:
+        report.to_csv(args.output, index = False)
+    sys.exit(int((report['severity'] == 'error').any()))